@@ -0,0 +1,50 @@
+"""Задержка страницы ленты событий в зависимости от глубины: keyset против OFFSET."""
+import pytest
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from events.models import Event
+from events.pagination import EventFeedPagination
+
+from .conftest import BENCH_EVENTS, measure, seed_events
+
+
+PAGE_SIZE = 20
+DEPTHS = [0, 0.01, 0.1, 0.5, 0.9, 0.999]
+
+
+@pytest.mark.django_db
+def test_feed_page_latency_is_flat(organizer):
+    seed_events(BENCH_EVENTS, organizer.id)
+    now = timezone.now()
+    ordered = Event.objects.with_feed_order(now).order_by('sort_order', 'start_time', 'id')
+    factory = APIRequestFactory()
+
+    print(f'\nСобытий: {BENCH_EVENTS}, размер страницы: {PAGE_SIZE}')
+    print(f"{'глубина':>10} {'keyset, мс':>12} {'OFFSET, мс':>12}")
+    keyset_timings = []
+    for depth in DEPTHS:
+        offset = int((BENCH_EVENTS - PAGE_SIZE) * depth)
+        params = {'page_size': PAGE_SIZE}
+        if offset:
+            sort_order, start_time, pk = ordered.values_list('sort_order', 'start_time', 'id')[offset - 1]
+            encoder = EventFeedPagination()
+            encoder.now = now
+            params['cursor'] = encoder.encode_cursor(sort_order - 1, start_time, pk)
+        request = Request(factory.get('/api/events/', params))
+
+        def keyset_page():
+            return EventFeedPagination().paginate_queryset(Event.objects.all(), request)
+
+        def offset_page():
+            return list(ordered[offset:offset + PAGE_SIZE])
+
+        assert [event.id for event in keyset_page()] == [event.id for event in offset_page()]
+        keyset_ms = measure(keyset_page)
+        offset_ms = measure(offset_page, repeat=3)
+        keyset_timings.append(keyset_ms)
+        print(f'{offset:>10} {keyset_ms:>12.2f} {offset_ms:>12.2f}')
+
+    # Глубокая страница не должна стоить заметно дороже первой.
+    assert max(keyset_timings) < 5 * max(keyset_timings[0], 1.0)
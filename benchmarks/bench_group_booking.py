@@ -0,0 +1,60 @@
+"""Групповая бронь одним запросом против цикла одиночных броней."""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Booking, Event
+
+from .conftest import measure
+
+
+GROUP_SIZES = [5, 20, 100]
+REPEAT = 5
+
+
+def make_events(organizer, count, seats):
+    return [
+        Event.objects.create(
+            title=f'Group {n}', description='d', start_time=timezone.now() + timedelta(days=1),
+            location='Bench City', seats=seats, status='planned', organizer=organizer
+        )
+        for n in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_group_booking_latency(organizer):
+    guests = User.objects.bulk_create(User(username=f'guest{n}') for n in range(max(GROUP_SIZES)))
+    client = APIClient()
+
+    print(f"\n{'группа':>7} {'batch, мс':>11} {'цикл, мс':>10} {'ускорение':>10}")
+    for size in GROUP_SIZES:
+        group = guests[:size]
+        batch_events = make_events(organizer, REPEAT, size)
+        loop_events = make_events(organizer, REPEAT, size)
+
+        def batch():
+            client.force_authenticate(organizer)
+            response = client.post(
+                '/api/bookings/batch/',
+                {'event': batch_events.pop().id, 'users': [guest.id for guest in group]},
+                format='json'
+            )
+            assert response.status_code == 201
+
+        def loop():
+            event = loop_events.pop()
+            for guest in group:
+                client.force_authenticate(guest)
+                response = client.post('/api/bookings/', {'event': event.id}, format='json')
+                assert response.status_code == 201
+
+        batch_ms = measure(batch, repeat=REPEAT)
+        loop_ms = measure(loop, repeat=REPEAT)
+        print(f'{size:>7} {batch_ms:>11.2f} {loop_ms:>10.2f} {loop_ms / batch_ms:>9.1f}x')
+        assert batch_ms < loop_ms
+
+    assert Booking.objects.count() == 2 * REPEAT * sum(GROUP_SIZES)
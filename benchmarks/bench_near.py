@@ -0,0 +1,53 @@
+"""Поиск ?near=: прямоугольник по индексу и точная дистанция против расчёта по всем событиям."""
+import pytest
+from django.db import connection
+
+from events.geo import distance_km, events_near
+from events.models import Event
+
+from .conftest import BENCH_EVENTS, measure, seed_events
+
+
+PAGE_SIZE = 20
+MOSCOW = (55.7558, 37.6173)
+RADII_KM = [5, 50, 200]
+
+
+def seed_coordinates():
+    """Треть событий вокруг Москвы (±3°), остальные — равномерно по суше средних широт."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Event._meta.db_table}
+            SET latitude = CASE WHEN id % 3 = 0 THEN 52.75 + random() * 6 ELSE -50 + random() * 120 END,
+                longitude = CASE WHEN id % 3 = 0 THEN 34.6 + random() * 6 ELSE -180 + random() * 360 END
+            """
+        )
+        cursor.execute(f'ANALYZE {Event._meta.db_table}')
+
+
+def scanned(latitude, longitude, radius_km):
+    """Без прямоугольника: дистанция считается для каждого события с координатами."""
+    return (
+        Event.objects.filter(latitude__isnull=False)
+        .annotate(distance_km=distance_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km', 'id')
+    )
+
+
+@pytest.mark.django_db
+def test_near_latency(organizer):
+    seed_events(BENCH_EVENTS, organizer.id)
+    seed_coordinates()
+
+    print(f'\nСобытий: {BENCH_EVENTS}')
+    print(f"{'радиус, км':>11} {'найдено':>9} {'индекс, мс':>11} {'перебор, мс':>12}")
+    for radius_km in RADII_KM:
+        nearby = events_near(Event.objects.all(), *MOSCOW, radius_km)
+        page = nearby[:PAGE_SIZE]
+        assert [event.id for event in page] == [event.id for event in scanned(*MOSCOW, radius_km)[:PAGE_SIZE]]
+        found = nearby.count()
+        indexed = measure(lambda: list(page.all()), repeat=5)
+        full = measure(lambda: list(scanned(*MOSCOW, radius_km)[:PAGE_SIZE]), repeat=3)
+        print(f'{radius_km:>11} {found:>9} {indexed:>11.2f} {full:>12.2f}')
@@ -0,0 +1,98 @@
+"""Нагрузка на поток уведомлений: тысячи простаивающих SSE-подключений в одном процессе."""
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from events.streams import STREAM_PATH, get_broker
+from events_app.asgi import application
+
+
+BENCH_STREAM_CONNECTIONS = int(os.getenv('BENCH_STREAM_CONNECTIONS', '5000'))
+
+
+def create_sessions(users):
+    """Сессии как после входа пользователей, одним bulk_create."""
+    store = SessionStore()
+    sessions = [
+        Session(
+            session_key=get_random_string(32),
+            session_data=store.encode({
+                SESSION_KEY: str(user.pk),
+                BACKEND_SESSION_KEY: 'django.contrib.auth.backends.ModelBackend',
+                HASH_SESSION_KEY: user.get_session_auth_hash(),
+            }),
+            expire_date=timezone.now() + timedelta(days=1)
+        )
+        for user in users
+    ]
+    Session.objects.bulk_create(sessions)
+    return [session.session_key for session in sessions]
+
+
+@pytest.mark.django_db
+def test_idle_stream_connections():
+    User.objects.bulk_create(
+        User(username=f'stream-user-{i}', password='') for i in range(BENCH_STREAM_CONNECTIONS)
+    )
+    users = list(User.objects.filter(username__startswith='stream-user-'))
+    session_keys = create_sessions(users)
+
+    async def scenario():
+        broker = get_broker()
+        disconnect = asyncio.Event()
+        delivered = asyncio.Queue()
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message.get('body', b'').startswith(b'id: '):
+                await delivered.put(message)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        tasks = [
+            asyncio.ensure_future(application({
+                'type': 'http',
+                'path': STREAM_PATH,
+                'headers': [(b'cookie', f'sessionid={key}'.encode())],
+                'query_string': b'',
+            }, receive, send))
+            for key in session_keys
+        ]
+        while broker.connection_count() < len(tasks):
+            await asyncio.sleep(0.05)
+        connect_seconds = time.perf_counter() - started
+        per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / len(tasks)
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for index, user in enumerate(users, 1):
+            broker.publish(user.pk, {'id': index, 'message': 'Мероприятие перенесено.'})
+        for _ in users:
+            await delivered.get()
+        fan_out_seconds = time.perf_counter() - started
+
+        disconnect.set()
+        await asyncio.gather(*tasks)
+        return connect_seconds, per_connection, fan_out_seconds, broker.connection_count()
+
+    connect_seconds, per_connection, fan_out_seconds, remaining = async_to_sync(scenario)()
+    print(f'\nПодключений: {BENCH_STREAM_CONNECTIONS}')
+    print(f'Установка всех подключений: {connect_seconds:.2f} с')
+    print(f'Память на простаивающее подключение: {per_connection / 1024:.1f} КиБ')
+    print(f'Доставка по одному событию каждому: {fan_out_seconds * 1000:.0f} мс')
+    assert remaining == 0
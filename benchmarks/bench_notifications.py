@@ -0,0 +1,61 @@
+"""Пропускная способность создания уведомлений: по одному и пачкой."""
+import contextlib
+import io
+import os
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from events.models import Event, Notification
+from events.tasks import notify_user, notify_users
+
+
+BENCH_NOTIFICATIONS = int(os.getenv('BENCH_NOTIFICATIONS', '5000'))
+
+
+def throughput(func):
+    """Выполняет func без вывода задач и возвращает уведомлений в секунду."""
+    Notification.objects.all().delete()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    elapsed = time.perf_counter() - started
+    assert Notification.objects.count() == BENCH_NOTIFICATIONS
+    return BENCH_NOTIFICATIONS / elapsed
+
+
+@pytest.mark.django_db
+def test_notification_throughput(organizer):
+    User.objects.bulk_create(
+        User(username=f'bench-user-{i}') for i in range(BENCH_NOTIFICATIONS)
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith='bench-user-').values_list('id', flat=True)
+    )
+    event = Event.objects.create(
+        title='Bench Event',
+        description='Bench description',
+        start_time=timezone.now(),
+        location='Bench City',
+        seats=BENCH_NOTIFICATIONS,
+        organizer=organizer
+    )
+    message = 'Мероприятие отменено.'
+
+    def per_message():
+        for user_id in user_ids:
+            notify_user(user_id, event.id, message)
+
+    def batched():
+        notify_users(user_ids, event.id, message)
+
+    results = [
+        ('notify_user', throughput(per_message)),
+        ('notify_users', throughput(batched)),
+    ]
+    print(f'\nУведомлений: {BENCH_NOTIFICATIONS}')
+    for mode, rate in results:
+        print(f'{mode:>14} {rate:>12.0f} уведомлений/с')
+    assert results[1][1] > results[0][1]
@@ -0,0 +1,61 @@
+"""Поиск ?q=: GIN по search_vector против ILIKE по title/description на растущем каталоге."""
+import pytest
+from django.db import connection
+from django.db.models import Max, Q
+
+from events.models import Event
+from events.search import search_events
+
+from .conftest import BENCH_EVENTS, measure, seed_events
+
+
+PAGE_SIZE = 20
+# Частые слова: jazz в 0,1% названий, rock ещё в 0,9%.
+TERMS = ['jazz', 'rock']
+
+
+def seed_words(after_id):
+    """Добавляет к названиям новых событий уникальное слово и частые слова из TERMS."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Event._meta.db_table}
+            SET title = title || ' k' || substr(md5(id::text), 1, 8)
+                || CASE WHEN id %% 1000 = 0 THEN ' jazz' WHEN id %% 100 = 0 THEN ' rock' ELSE '' END
+            WHERE id > %s
+            """,
+            [after_id]
+        )
+        cursor.execute(f'ANALYZE {Event._meta.db_table}')
+
+
+def unique_word(event_id):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 'k' || substr(md5(%s::text), 1, 8)", [event_id])
+        return cursor.fetchone()[0]
+
+
+def scanned(text):
+    """То, что клиенты делали сами: подстрока в названии или описании."""
+    return Event.objects.filter(
+        Q(title__icontains=text) | Q(description__icontains=text)
+    ).order_by('start_time', 'id')
+
+
+@pytest.mark.django_db
+def test_search_latency(organizer):
+    print(f"\n{'событий':>9} {'запрос':>10} {'найдено':>9} {'GIN, мс':>10} {'ILIKE, мс':>11}")
+    seeded = 0
+    for size in (BENCH_EVENTS // 10, BENCH_EVENTS):
+        last_id = Event.objects.aggregate(last=Max('id'))['last'] or 0
+        seed_events(size - seeded, organizer.id)
+        seed_words(last_id)
+        seeded = size
+
+        for text in [unique_word(last_id + 1)] + TERMS:
+            search = search_events(Event.objects.all(), text)
+            page = search[:PAGE_SIZE]
+            found = search.count()
+            gin = measure(lambda: list(page.all()), repeat=5)
+            ilike = measure(lambda: list(scanned(text)[:PAGE_SIZE]), repeat=3)
+            print(f'{size:>9} {text:>10} {found:>9} {gin:>10.2f} {ilike:>11.2f}')
@@ -0,0 +1,76 @@
+"""Списки событий, броней и уведомлений: DRF-сериализаторы против строк .values() и JSON через orjson."""
+import pytest
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from events.models import Booking, Event, Notification
+from events.renderers import FastJSONRenderer, orjson
+from events.serializers import ValuesSerializer
+from events.views import BookingViewSet, EventViewSet, NotificationViewSet
+
+from .conftest import measure, seed_events
+from .bench_sparse_fields import seed_details
+
+
+# Считаем стоимость строки ответа, а не поиска в каталоге.
+EVENTS = 10000
+ROWS = 1000
+
+
+def seed_user_rows(user):
+    """По ROWS броней и уведомлений у одного пользователя."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Booking._meta.db_table} (user_id, event_id, created_at)
+            SELECT %s, id, now() FROM {Event._meta.db_table} ORDER BY id LIMIT %s
+            """,
+            [user.id, ROWS]
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {Notification._meta.db_table} (user_id, event_id, message, created_at)
+            SELECT %s, id, 'Напоминание о событии ' || title, now()
+            FROM {Event._meta.db_table} ORDER BY id LIMIT %s
+            """,
+            [user.id, ROWS]
+        )
+
+
+def view_for(viewset, url, user, params=None):
+    request = APIRequestFactory().get(url, params)
+    force_authenticate(request, user)
+    request = Request(request)
+    request.user = user
+    return viewset(action='list', request=request, format_kwarg=None, kwargs={})
+
+
+@pytest.mark.django_db
+def test_serialization_throughput(organizer):
+    seed_events(EVENTS, organizer.id)
+    seed_details()
+    seed_user_rows(organizer)
+    cases = [
+        ('события', view_for(EventViewSet, '/api/events/', organizer), EventViewSet.values_serializer_class),
+        ('брони', view_for(BookingViewSet, '/api/bookings/', organizer), ValuesSerializer),
+        ('уведомления', view_for(NotificationViewSet, '/api/notifications/', organizer), ValuesSerializer),
+    ]
+
+    print(f"\n{'список':>12} {'DRF, строк/с':>14} {'values(), строк/с':>19} {'JSON, мс':>9} {'orjson, мс':>11}")
+    for name, view, values_serializer_class in cases:
+        queryset = view.get_queryset()[:ROWS]
+        serializer = values_serializer_class(view.get_serializer(), queryset)
+        rows = serializer.values(queryset)
+        data = serializer.to_representation(rows)
+        assert data == view.get_serializer(queryset, many=True).data
+
+        drf = measure(lambda: view.get_serializer(queryset.all(), many=True).data, repeat=5)
+        values = measure(lambda: serializer.to_representation(rows.all()), repeat=5)
+        render = measure(lambda: JSONRenderer().render(data))
+        fast = measure(lambda: FastJSONRenderer().render(data)) if orjson else float('nan')
+        print(
+            f'{name:>12} {ROWS / drf * 1000:>14.0f} {ROWS / values * 1000:>19.0f}'
+            f' {render:>9.2f} {fast:>11.2f}'
+        )
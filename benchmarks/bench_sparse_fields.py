@@ -0,0 +1,65 @@
+"""Размер и стоимость страницы /events/: полная карточка против ?omit=, ?fields= и ?compact=."""
+import pytest
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from events.models import Event, Tag
+from events.views import EventViewSet
+
+from .conftest import measure, seed_events
+
+
+# Размер страницы важнее размера каталога, поэтому набор небольшой.
+EVENTS = 10000
+PAGE_SIZE = 100
+VARIANTS = [
+    ('полная', {}),
+    ('omit=description', {'omit': 'description'}),
+    ('fields=5', {'fields': 'id,title,start_time,location,status'}),
+    ('compact', {'compact': 'true'}),
+]
+
+
+def seed_details():
+    """Описания ~1 КБ и по три тега на событие, как у настоящих карточек."""
+    tags = Tag.objects.bulk_create(Tag(name=f'tag-{n}') for n in range(20))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Event._meta.db_table} SET description = repeat(description || '. ', 40)"
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {Event.tags.through._meta.db_table} (event_id, tag_id)
+            SELECT e.id, %s + (e.id + k) %% 20 FROM {Event._meta.db_table} AS e, generate_series(0, 2) AS k
+            """,
+            [tags[0].pk]
+        )
+    Event.objects.refresh_tag_ids()
+
+
+def view_for(params):
+    request = Request(APIRequestFactory().get('/api/events/', {'page_size': PAGE_SIZE, **params}))
+    return EventViewSet(action='list', request=request, format_kwarg=None, kwargs={})
+
+
+@pytest.mark.django_db
+def test_sparse_fields_payload(organizer):
+    seed_events(EVENTS, organizer.id)
+    seed_details()
+
+    print(f"\n{'вариант':>18} {'байт':>9} {'SQL, мс':>9} {'сериализация, мс':>17} {'JSON, мс':>9}")
+    for name, params in VARIANTS:
+        view = view_for(params)
+
+        def read():
+            return view.paginate_queryset(view.filter_queryset(view.get_queryset()))
+
+        page = read()
+        data = view.get_serializer(page, many=True).data
+        payload = JSONRenderer().render(data)
+        sql = measure(read)
+        serialize = measure(lambda: view.get_serializer(page, many=True).data)
+        render = measure(lambda: JSONRenderer().render(data))
+        print(f'{name:>18} {len(payload):>9} {sql:>9.2f} {serialize:>17.2f} {render:>9.2f}')
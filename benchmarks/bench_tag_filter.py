@@ -0,0 +1,79 @@
+"""AND-фильтр по тегам: GIN по tag_ids против GROUP BY ... HAVING и JOIN на каждый тег."""
+import pytest
+from django.db import connection
+from django.db.models import Count
+
+from events.filters import EventFilter
+from events.models import Event, Tag
+
+from .conftest import BENCH_EVENTS, measure, seed_events
+
+
+TAGS = 50
+TAGS_PER_EVENT = 8
+TAG_COUNTS = [1, 3, 10]
+PAGE_SIZE = 20
+
+
+def seed_tags():
+    """Каждому событию достаётся до TAGS_PER_EVENT тегов со смещением по его id."""
+    tags = Tag.objects.bulk_create(Tag(name=f'tag-{n}') for n in range(TAGS))
+    through = Event.tags.through._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {through} (event_id, tag_id)
+            SELECT e.id, %s + (e.id * 7 + k * (1 + e.id %% 3)) %% %s
+            FROM {Event._meta.db_table} AS e, generate_series(0, %s) AS k
+            ON CONFLICT DO NOTHING
+            """,
+            [tags[0].pk, TAGS, TAGS_PER_EVENT - 1]
+        )
+    Event.objects.refresh_tag_ids()
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {through}')
+        cursor.execute(f'ANALYZE {Event._meta.db_table}')
+    return [tag.pk for tag in tags]
+
+
+def grouped(tag_ids):
+    """Один проход по связующей таблице с GROUP BY event_id HAVING COUNT = k."""
+    tagged = (
+        Event.tags.through.objects.filter(tag_id__in=tag_ids)
+        .values('event_id')
+        .annotate(matched=Count('tag_id'))
+        .filter(matched=len(tag_ids))
+        .values('event_id')
+    )
+    return Event.objects.filter(pk__in=tagged)
+
+
+def conjoined(tag_ids):
+    """Прежняя реализация: filter(tags=...) для каждого тега, JOIN на каждый."""
+    queryset = Event.objects.all()
+    for tag_id in tag_ids:
+        queryset = queryset.filter(tags=tag_id)
+    return queryset
+
+
+@pytest.mark.django_db
+def test_tag_filter_latency(organizer):
+    seed_events(BENCH_EVENTS, organizer.id)
+    tag_ids = seed_tags()
+
+    print(f'\nСобытий: {BENCH_EVENTS}, тегов: {TAGS}, тегов у события: {TAGS_PER_EVENT}')
+    print(f"{'тегов':>6} {'найдено':>9} {'GIN, мс':>10} {'HAVING, мс':>12} {'JOIN, мс':>10}")
+    for count in TAG_COUNTS:
+        selected = tag_ids[:count]
+        variants = [
+            EventFilter({'tags': selected}, queryset=Event.objects.all()).qs,
+            grouped(selected),
+            conjoined(selected),
+        ]
+        pages = [queryset.order_by('start_time', 'id')[:PAGE_SIZE] for queryset in variants]
+
+        expected = [event.id for event in pages[-1]]
+        assert all([event.id for event in page] == expected for page in pages)
+        found = variants[0].count()
+        timings = [measure(lambda: list(page.all()), repeat=5) for page in pages]
+        print(f'{count:>6} {found:>9} {timings[0]:>10.2f} {timings[1]:>12.2f} {timings[2]:>10.2f}')
@@ -0,0 +1,68 @@
+"""Общие фикстуры бенчмарков.
+
+Бенчмарки не собираются обычным прогоном pytest (файлы bench_*.py), их
+запускают явно, например: ``pytest benchmarks/bench_feed_pagination.py -s``.
+Размер набора данных задаётся переменной окружения BENCH_EVENTS.
+"""
+import os
+import statistics
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+
+from events.models import Event
+
+
+BENCH_EVENTS = int(os.getenv('BENCH_EVENTS', '1000000'))
+
+
+def seed_events(count, organizer_id):
+    """Быстро вставляет count событий одним INSERT ... SELECT generate_series."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Event._meta.db_table} (
+                title, description, start_time, location, seats, booked_count,
+                rating_sum, rating_count, status, organizer_id, created_at, tag_ids
+            )
+            SELECT
+                'Event ' || n,
+                'Generated description ' || n,
+                now() + ((n %% 20000) - 10000) * interval '1 hour',
+                'City ' || (n %% 500),
+                10 + n %% 990,
+                n %% 10,
+                (n %% 7) * 4,
+                n %% 7,
+                (ARRAY['planned', 'planned', 'planned', 'completed', 'canceled'])[1 + n %% 5],
+                %s,
+                now(),
+                '{{}}'
+            FROM generate_series(1, %s) AS n
+            """,
+            [organizer_id, count]
+        )
+        cursor.execute(f'ANALYZE {Event._meta.db_table}')
+
+
+def measure(func, repeat=7):
+    """Медиана времени выполнения func в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+@pytest.fixture
+def organizer(db):
+    return User.objects.create_user(username='bench-organizer', password='benchpassword')
+
+
+@pytest.fixture(autouse=True)
+def eager_celery(settings):
+    """Брокера нет: задачи выполняются синхронно, как в тестах."""
+    settings.CELERY_TASK_ALWAYS_EAGER = True
@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from .models import Event, Booking, Notification
+from .models import Event, Booking, Notification, Waitlist
 
 
 admin.site.register(Event)
 admin.site.register(Booking)
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(Waitlist)
@@ -0,0 +1,72 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notification
+
+
+def unread_count_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    """Возвращает число непрочитанных уведомлений, кешируя его по пользователю."""
+    key = unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, read_at__isnull=True).count()
+        cache.set(key, count, settings.NOTIFICATION_UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_unread_counts(user_ids):
+    """Сбрасывает закешированные счётчики одним обращением к кешу."""
+    cache.delete_many([unread_count_key(user_id) for user_id in user_ids])
+
+
+EVENTS_VERSION_KEY = 'events:version'
+
+
+def get_events_version():
+    """Текущая версия кеша событий; смена версии делает старые ключи недостижимыми."""
+    version = cache.get(EVENTS_VERSION_KEY)
+    if version is None:
+        # Начальная версия от времени, чтобы после вытеснения ключа
+        # не вернуться к номеру, под которым ещё лежат старые ответы.
+        cache.add(EVENTS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(EVENTS_VERSION_KEY)
+    return version
+
+
+def bump_events_version():
+    try:
+        cache.incr(EVENTS_VERSION_KEY)
+    except ValueError:
+        cache.set(EVENTS_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_events_cache():
+    """Сбрасывает кеш событий за O(1) после фиксации текущей транзакции."""
+    transaction.on_commit(bump_events_version)
+
+
+def calendar_bucket_keys(granularity, starts):
+    """Ключи корзин календаря по их началу; устаревают вместе с остальным кешем событий."""
+    version = get_events_version()
+    return {start: f'events:{version}:calendar:{granularity}:{start.isoformat()}' for start in starts}
+
+
+def events_cache_key(view_name, query_params, **kwargs):
+    """Ключ ответа: версия, действие, аргументы URL и нормализованные параметры запроса."""
+    params = sorted(
+        (name, value)
+        for name in query_params
+        for value in query_params.getlist(name)
+    )
+    raw = urlencode(sorted(kwargs.items()) + params)
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'events:{get_events_version()}:{view_name}:{digest}'
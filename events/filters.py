@@ -1,20 +1,52 @@
 import logging
 
 import django_filters
-from django.db.models import Avg, Count, F
+from django import forms
+from django.conf import settings
+from django.db.models import F
 
+from .geo import events_near
 from .models import Event, Tag
+from .search import search_events
 
 logger = logging.getLogger(__name__)
 
 
+class PointField(forms.Field):
+    """Точка «широта,долгота» в градусах."""
+    default_error_messages = {
+        'invalid': 'Ожидается «широта,долгота», например 55.75,37.62.',
+        'out_of_range': 'Широта должна быть от -90 до 90, долгота — от -180 до 180.',
+    }
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise forms.ValidationError(self.error_messages['invalid'], code='invalid')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError(self.error_messages['out_of_range'], code='out_of_range')
+        return latitude, longitude
+
+
+class PointFilter(django_filters.Filter):
+    field_class = PointField
+
+
 class EventFilter(django_filters.FilterSet):
     available = django_filters.BooleanFilter(method='filter_available')
-    avg_rating = django_filters.NumberFilter(field_name='avg_rating', lookup_expr='gte')
+    avg_rating = django_filters.NumberFilter(method='filter_avg_rating_gte')
+    q = django_filters.CharFilter(method='filter_search')
+    near = PointFilter(method='filter_near')
+    radius_km = django_filters.NumberFilter(
+        method='filter_radius_km', min_value=0, max_value=settings.EVENTS_NEAR_MAX_RADIUS_KM
+    )
     tags = django_filters.ModelMultipleChoiceFilter(
         field_name='tags',
         queryset=Tag.objects.all(),
-        conjoined=True
+        method='filter_tags'
     )
 
     class Meta:
@@ -27,11 +59,7 @@ class EventFilter(django_filters.FilterSet):
         }
     
     def filter_queryset(self, queryset):
-        """Аннотирует queryset средней оценкой и количеством бронирований."""
-        queryset = queryset.annotate(
-            avg_rating=Avg('ratings__score'),
-            booked=Count('bookings')
-        )
+        """Применяет фильтры, возвращая пустой queryset при ошибке."""
         try:
             return super().filter_queryset(queryset)
         except Exception as e:
@@ -41,11 +69,37 @@ class EventFilter(django_filters.FilterSet):
     def filter_available(self, queryset, name, value):
         """Фильтрует события по доступности мест."""
         if value:
-            return queryset.filter(booked__lt=F('seats'))
-        return queryset.filter(booked__gte=F('seats'))
+            return queryset.filter(booked_count__lt=F('seats'))
+        return queryset.filter(booked_count__gte=F('seats'))
     
     def filter_avg_rating_gte(self, queryset, name, value):
         """Фильтрует события по средней оценке (>=)."""
         if value is not None:
-            return queryset.filter(avg_rating__gte=value)
+            return queryset.with_avg_rating().filter(avg_rating__gte=value)
+        return queryset
+
+    def filter_tags(self, queryset, name, value):
+        """Оставляет события, у которых есть все выбранные теги (AND)."""
+        tag_ids = sorted({tag.pk for tag in value})
+        if not tag_ids:
+            return queryset
+        # Пересечение по GIN-индексу tag_ids вместо JOIN на каждый тег.
+        return queryset.filter(tag_ids__contains=tag_ids)
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию; сортирует по релевантности."""
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_events(queryset, value)
+
+    def filter_near(self, queryset, name, value):
+        """События в радиусе radius_km от точки, ближайшие первыми."""
+        radius_km = self.form.cleaned_data.get('radius_km')
+        if radius_km is None:
+            radius_km = settings.EVENTS_NEAR_DEFAULT_RADIUS_KM
+        return events_near(queryset, *value, float(radius_km))
+
+    def filter_radius_km(self, queryset, name, value):
+        """Радиус применяется в filter_near."""
         return queryset
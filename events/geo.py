@@ -0,0 +1,51 @@
+from math import asin, cos, degrees, radians, sin
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Условие на прямоугольник координат, описанный вокруг круга радиуса radius_km.
+
+    Прямоугольник отбирается по индексу (latitude, longitude); у полюсов
+    он расширяется до всех долгот, а через 180-й меридиан делится на два.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    min_latitude = latitude - degrees(angle)
+    max_latitude = latitude + degrees(angle)
+    box = Q(latitude__gte=max(min_latitude, -90), latitude__lte=min(max_latitude, 90))
+    if min_latitude <= -90 or max_latitude >= 90 or sin(angle) >= cos(radians(latitude)):
+        return box & Q(longitude__isnull=False)
+
+    delta = degrees(asin(sin(angle) / cos(radians(latitude))))
+    min_longitude, max_longitude = longitude - delta, longitude + delta
+    if min_longitude < -180:
+        return box & (Q(longitude__gte=min_longitude + 360) | Q(longitude__lte=max_longitude))
+    if max_longitude > 180:
+        return box & (Q(longitude__gte=min_longitude) | Q(longitude__lte=max_longitude - 360))
+    return box & Q(longitude__gte=min_longitude, longitude__lte=max_longitude)
+
+
+def distance_km(latitude, longitude):
+    """Расстояние по большому кругу от точки до события (формула гаверсинуса)."""
+    half_latitude = (Radians(F('latitude')) - radians(latitude)) / 2
+    half_longitude = (Radians(F('longitude')) - radians(longitude)) / 2
+    haversine = (
+        Power(Sin(half_latitude), 2)
+        + Value(cos(radians(latitude))) * Cos(Radians(F('latitude'))) * Power(Sin(half_longitude), 2)
+    )
+    # Округление может дать чуть больше 1, а это вне области asin.
+    return 2 * EARTH_RADIUS_KM * ASin(Least(Sqrt(haversine), Value(1.0)))
+
+
+def events_near(queryset, latitude, longitude, radius_km):
+    """События не дальше radius_km от точки, ближайшие первыми."""
+    return (
+        queryset.filter(bounding_box(latitude, longitude, radius_km))
+        .annotate(distance_km=distance_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km', 'id')
+    )
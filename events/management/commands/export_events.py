@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from events.services import EventExportService
+
+
+class Command(BaseCommand):
+    help = 'Выгружает все события в NDJSON (объект на строку).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Путь к файлу; по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        lines = EventExportService().export_lines(Event.objects.all())
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line.decode(), ending='')
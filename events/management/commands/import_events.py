@@ -0,0 +1,37 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from events.services import EventImportService
+
+
+class Command(BaseCommand):
+    help = 'Импортирует события из файла NDJSON (объект на строку).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Путь к файлу NDJSON или '-' для stdin.")
+        parser.add_argument(
+            '--organizer', required=True,
+            help='Имя пользователя-организатора для строк без organizer_id.'
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            organizer = User.objects.get(username=options['organizer'])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['organizer']} не найден.")
+
+        service = EventImportService(organizer, batch_size=options['batch_size'])
+        if options['path'] == '-':
+            created, errors = service.import_lines(sys.stdin.buffer)
+        else:
+            with open(options['path'], 'rb') as lines:
+                created, errors = service.import_lines(lines)
+
+        if errors:
+            for error in errors:
+                self.stderr.write(f"Строка {error['line']}: {error['errors']}")
+            raise CommandError('Импорт отменён, события не созданы.')
+        self.stdout.write(f"Импортировано событий: {created}")
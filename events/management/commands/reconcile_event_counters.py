@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from events.models import Booking, Event, Rating, SeatHold, linked_tag_ids
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики событий по исходным таблицам.'
+
+    def total(self, queryset, aggregate):
+        """Подзапрос с агрегатом по строкам, относящимся к событию."""
+        return Coalesce(
+            Subquery(
+                queryset.filter(event=OuterRef('pk'))
+                .order_by()
+                .values('event')
+                .annotate(total=aggregate)
+                .values('total')
+            ),
+            0
+        )
+
+    def handle(self, *args, **options):
+        # Место занимает и бронь, и ещё не снятое удержание.
+        booked = (
+            self.total(Booking.objects.all(), Count('pk'))
+            + self.total(SeatHold.objects.all(), Count('pk'))
+        )
+        fixed = (
+            Event.objects.exclude(booked_count=booked)
+            .update(booked_count=booked)
+        )
+        self.stdout.write(f"Исправлено счётчиков мест: {fixed}")
+
+        rating_sum = self.total(Rating.objects.all(), Sum('score'))
+        rating_count = self.total(Rating.objects.all(), Count('pk'))
+        fixed = (
+            Event.objects.filter(~Q(rating_sum=rating_sum) | ~Q(rating_count=rating_count))
+            .update(rating_sum=rating_sum, rating_count=rating_count)
+        )
+        self.stdout.write(f"Исправлено агрегатов оценок: {fixed}")
+
+        fixed = Event.objects.exclude(tag_ids=linked_tag_ids()).refresh_tag_ids()
+        self.stdout.write(f"Исправлено наборов тегов: {fixed}")
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_booked_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Booking = apps.get_model('events', 'Booking')
+    booked = (
+        Booking.objects.filter(event=OuterRef('pk'))
+        .order_by()
+        .values('event')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Event.objects.update(booked_count=Coalesce(Subquery(booked), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_booked_count, migrations.RunPython.noop),
+    ]
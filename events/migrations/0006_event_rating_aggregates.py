@@ -0,0 +1,42 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+import django.db.models.expressions
+import django.db.models.functions.comparison
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Rating = apps.get_model('events', 'Rating')
+    ratings = Rating.objects.filter(event=OuterRef('pk')).order_by().values('event')
+    Event.objects.update(
+        rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('score')).values('total')), 0),
+        rating_count=Coalesce(Subquery(ratings.annotate(total=Count('pk')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_booked_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast(models.F('rating_sum'), models.FloatField()), '/', django.db.models.functions.comparison.NullIf(models.F('rating_count'), models.Value(0))), output_field=models.FloatField()), name='event_avg_rating_idx'),
+        ),
+    ]
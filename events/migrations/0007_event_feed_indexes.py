@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('status', 'planned')), fields=['start_time', 'id'], name='event_feed_planned_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('status', 'planned'), _negated=True), fields=['start_time', 'id'], name='event_feed_closed_idx'),
+        ),
+    ]
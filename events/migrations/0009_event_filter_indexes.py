@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_notification_read_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'start_time', 'id'], name='event_location_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['seats', 'start_time', 'id'], name='event_seats_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('booked_count__gte', models.F('seats'))), fields=['start_time', 'id'], name='event_sold_out_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:10
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+
+def fill_tag_ids(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    linked = ArraySubquery(
+        Event.tags.through.objects.filter(event_id=OuterRef('pk'))
+        .order_by('tag_id')
+        .values('tag_id')
+    )
+    Event.objects.update(tag_ids=linked)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='tag_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.RunPython(fill_tag_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_ids'], name='event_tag_ids_gin_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def fill_event_stats(apps, schema_editor):
+    # Отмены в прошлом не сохранились, поэтому восстанавливаются только брони.
+    Booking = apps.get_model('events', 'Booking')
+    Rating = apps.get_model('events', 'Rating')
+    EventHourlyStats = apps.get_model('events', 'EventHourlyStats')
+    EventRatingStats = apps.get_model('events', 'EventRatingStats')
+    hourly = (
+        Booking.objects.annotate(hour=TruncHour('created_at'))
+        .order_by()
+        .values('event', 'hour')
+        .annotate(total=Count('pk'))
+    )
+    EventHourlyStats.objects.bulk_create([
+        EventHourlyStats(event_id=row['event'], hour=row['hour'], bookings=row['total'])
+        for row in hourly.iterator()
+    ], batch_size=1000)
+    histogram = (
+        Rating.objects.order_by()
+        .values('event', 'score')
+        .annotate(total=Count('pk'))
+    )
+    EventRatingStats.objects.bulk_create([
+        EventRatingStats(event_id=row['event'], score=row['score'], count=row['total'])
+        for row in histogram.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRatingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_stats', to='events.event')),
+            ],
+            options={
+                'unique_together': {('event', 'score')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EventHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='events.event')),
+            ],
+            options={
+                'unique_together': {('event', 'hour')},
+            },
+        ),
+        migrations.RunPython(fill_event_stats, migrations.RunPython.noop),
+    ]
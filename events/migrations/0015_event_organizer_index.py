@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_event_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'start_time', 'id'], name='event_organizer_start_idx'),
+        ),
+    ]
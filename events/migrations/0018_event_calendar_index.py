@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0017_event_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'id'], include=('title', 'status'), name='event_calendar_idx'),
+        ),
+    ]
@@ -1,8 +1,67 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
 from rest_framework.response import Response
 
+from .cache import events_cache_key
+from .serializers import ValuesSerializer
+
 class ErrorHandlingMixin:
     def create_error_response(self, detail, status_code):
         return Response(
             {"detail": detail},
             status=status_code
         )
+
+
+class CachedReadMixin:
+    """Read-through кеш ответов list/retrieve с ETag и ответом 304."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, 'list', super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, 'retrieve', super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, view_name, render, *args, **kwargs):
+        key = events_cache_key(
+            view_name, request.query_params, host=request.build_absolute_uri('/'), **kwargs
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = render(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = '"%s"' % hashlib.md5(f'{key}:{time.time_ns()}'.encode()).hexdigest()
+            cached = (etag, response.data)
+            cache.set(key, cached, settings.EVENTS_CACHE_TIMEOUT)
+
+        etag, data = cached
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+
+class ValuesListMixin:
+    """list() по строкам .values(): тот же вывод, что у serializer_class, без объектов моделей."""
+    values_serializer_class = ValuesSerializer
+    # Колонки, которые нужны пагинации, даже если их нет в ответе.
+    values_extra_lookups = ()
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.values_serializer_class(self.get_serializer(), queryset)
+        rows = serializer.values(queryset, *self.values_extra_lookups)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(rows))
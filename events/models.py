@@ -1,10 +1,104 @@
+import uuid
 from datetime import timedelta
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connection, models
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
 from django.utils import timezone
 
 
+# Конфигурация полнотекстового поиска: русская морфология, латиница — английским стеммером.
+SEARCH_CONFIG = 'russian'
+
+# Средняя оценка из хранимых сумм; то же выражение индексируется в Event.Meta.
+AVG_RATING = ExpressionWrapper(
+    Cast(F('rating_sum'), FloatField()) / NullIf(F('rating_count'), Value(0)),
+    output_field=FloatField()
+)
+
+
+def feed_buckets(now):
+    """Группы ленты по порядку: предстоящие, закрытые, прошедшие без статуса."""
+    return [
+        Q(status='planned', start_time__gte=now),
+        ~Q(status='planned'),
+        Q(status='planned', start_time__lt=now),
+    ]
+
+
+def linked_tag_ids():
+    """Отсортированные id тегов события из связующей таблицы (для UPDATE по событиям)."""
+    return ArraySubquery(
+        Event.tags.through.objects.filter(event_id=OuterRef('pk'))
+        .order_by('tag_id')
+        .values('tag_id')
+    )
+
+
+def count_per_event(queryset):
+    """Коррелированный подзапрос с числом строк queryset, относящихся к событию."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(event=OuterRef('pk'))
+            .order_by()
+            .values('event')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+class EventQuerySet(models.QuerySet):
+    def with_feed_order(self, now):
+        """Аннотирует номер группы ленты для сортировки по sort_order."""
+        return self.annotate(
+            sort_order=Case(
+                *[When(bucket, then=Value(index)) for index, bucket in enumerate(feed_buckets(now), 1)],
+                output_field=IntegerField()
+            )
+        )
+
+    def with_avg_rating(self):
+        """Аннотирует среднюю оценку без JOIN по таблице оценок."""
+        return self.annotate(avg_rating=AVG_RATING)
+
+    def with_organizer_stats(self):
+        """Аннотирует брони, удержания, свободные места, среднюю оценку и недоставленные уведомления.
+
+        Счётчики берутся подзапросами, а не JOIN-ами: строки событий
+        не размножаются бронями и уведомлениями, и GROUP BY не нужен.
+        Свободные места считаются из тех же подзапросов, поэтому
+        booked + held + remaining = seats.
+        """
+        return self.annotate(
+            booked=count_per_event(Booking.objects.all()),
+            held=count_per_event(SeatHold.objects.all()),
+            avg_rating=AVG_RATING,
+            pending_notifications=count_per_event(NotificationOutbox.objects.all())
+        ).annotate(
+            remaining=Greatest(F('seats') - F('booked') - F('held'), Value(0))
+        )
+
+    def refresh_tag_ids(self):
+        """Пересобирает tag_ids выбранных событий одним UPDATE."""
+        return self.update(tag_ids=linked_tag_ids())
+
+
+class EventManager(models.Manager.from_queryset(EventQuerySet)):
+    def get_queryset(self):
+        # Поисковый вектор нужен только в WHERE/ORDER BY, не в объектах.
+        return super().get_queryset().defer('search_vector')
+
+
 class Event(models.Model):
     STATUS_CHOICES = (
         ('planned', 'Ожидается'),
@@ -15,7 +109,20 @@ class Event(models.Model):
     description = models.TextField()
     start_time = models.DateTimeField()
     location = models.CharField(max_length=100)
+    # Координаты места для поиска рядом (?near=); необязательны.
+    latitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
     seats = models.PositiveIntegerField()
+    # Занятые места: брони и действующие удержания (SeatHold).
+    booked_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
     status = models.CharField(
         max_length=20, 
         choices=STATUS_CHOICES, 
@@ -28,6 +135,63 @@ class Event(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     tags = models.ManyToManyField('Tag', related_name='events', blank=True)
+    # Копия id из tags для AND-фильтра по GIN-индексу; ведётся сигналами.
+    tag_ids = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+    # Вектор title (вес A) и description (вес B); заполняет триггер БД при
+    # INSERT и UPDATE этих полей, включая bulk_create и сырой SQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = EventManager()
+
+    class Meta:
+        indexes = [
+            models.Index(AVG_RATING, name='event_avg_rating_idx'),
+            # Ключи постраничной ленты: (start_time, id) внутри каждой группы.
+            models.Index(
+                fields=['start_time', 'id'],
+                condition=Q(status='planned'),
+                name='event_feed_planned_idx'
+            ),
+            models.Index(
+                fields=['start_time', 'id'],
+                condition=~Q(status='planned'),
+                name='event_feed_closed_idx'
+            ),
+            # Фильтры EventFilter с равенством по полю, дочитываемые в порядке ленты.
+            models.Index(
+                fields=['location', 'start_time', 'id'],
+                name='event_location_start_idx'
+            ),
+            models.Index(
+                fields=['seats', 'start_time', 'id'],
+                name='event_seats_start_idx'
+            ),
+            # Прямоугольник вокруг точки для ?near=: диапазон широт, внутри — долготы.
+            models.Index(
+                fields=['latitude', 'longitude'],
+                condition=Q(latitude__isnull=False),
+                name='event_coordinates_idx'
+            ),
+            # Календарь: диапазон start_time целиком из индекса, без чтения таблицы.
+            models.Index(
+                fields=['start_time', 'id'],
+                include=['title', 'status'],
+                name='event_calendar_idx'
+            ),
+            # Кабинет организатора читается в порядке ленты.
+            models.Index(
+                fields=['organizer', 'start_time', 'id'],
+                name='event_organizer_start_idx'
+            ),
+            # available=false: распроданные события — малая доля каталога.
+            models.Index(
+                fields=['start_time', 'id'],
+                condition=Q(booked_count__gte=F('seats')),
+                name='event_sold_out_idx'
+            ),
+            GinIndex(fields=['tag_ids'], name='event_tag_ids_gin_idx'),
+            GinIndex(fields=['search_vector'], name='event_search_vector_idx'),
+        ]
 
     def can_book(self):
         """Проверка, можно ли забронировать место на событие."""
@@ -58,6 +222,60 @@ class Booking(models.Model):
         return f"{self.user.username} - {self.event.title}"
 
 
+class SeatHold(models.Model):
+    """Временное удержание места до подтверждения брони по токену."""
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='seat_holds'
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='seat_holds'
+    )
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'event')
+        indexes = [
+            models.Index(fields=['expires_at'], name='seat_hold_expires_idx'),
+        ]
+
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def __str__(self):
+        return f"{self.user.username} держит место на {self.event.title}"
+
+
+class Waitlist(models.Model):
+    """Очередь ожидания места на заполненное событие; порядок — по id (FIFO)."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='waitlist'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'event')
+        indexes = [
+            # Голова очереди и позиция в ней читаются диапазоном (event_id, id).
+            models.Index(fields=['event', 'id'], name='waitlist_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ждёт {self.event.title}"
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
 
@@ -79,11 +297,65 @@ class Notification(models.Model):
     )
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='notification_user_id_idx'),
+            models.Index(
+                fields=['user'],
+                condition=Q(read_at__isnull=True),
+                name='notification_unread_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message}"
 
 
+class NotificationOutboxQuerySet(models.QuerySet):
+    def enqueue(self, user_ids, event_id, message):
+        """Пишет уведомления в outbox текущей транзакции; доставит relay."""
+        return self.bulk_create([
+            self.model(user_id=user_id, event_id=event_id, message=message)
+            for user_id in user_ids
+        ])
+
+    def enqueue_attendees(self, event_id, message):
+        """Пишет уведомление всем участникам события одним INSERT ... SELECT.
+
+        Строки не проходят через Python, поэтому память не зависит
+        от числа участников; возвращает число записей.
+        """
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {quote(self.model._meta.db_table)} (user_id, event_id, message, created_at)
+                SELECT user_id, event_id, %s, now()
+                FROM {quote(Booking._meta.db_table)}
+                WHERE event_id = %s
+                """,
+                [message, event_id]
+            )
+            return cursor.rowcount
+
+
+class NotificationOutbox(models.Model):
+    """Уведомления, записанные вместе с изменением брони и ещё не доставленные."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Когда relay последний раз опубликовал запись в Celery.
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationOutboxQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Outbox for {self.user_id}: {self.message}"
+
+
 class Rating(models.Model):
     event = models.ForeignKey(
         Event, 
@@ -104,4 +376,38 @@ class Rating(models.Model):
         unique_together = ('event', 'user') 
 
     def __str__(self):
-        return f"{self.user.username} - {self.event.title} ({self.score})"
\ No newline at end of file
+        return f"{self.user.username} - {self.event.title} ({self.score})"
+
+class EventHourlyStats(models.Model):
+    """Брони и отмены события за час; ведётся приращениями при записи броней."""
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='hourly_stats'
+    )
+    hour = models.DateTimeField()
+    bookings = models.PositiveIntegerField(default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('event', 'hour')
+
+    def __str__(self):
+        return f"{self.event_id} @ {self.hour:%Y-%m-%d %H:00}: +{self.bookings} -{self.cancellations}"
+
+
+class EventRatingStats(models.Model):
+    """Число оценок события с данным баллом: столбец гистограммы."""
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='rating_stats'
+    )
+    score = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('event', 'score')
+
+    def __str__(self):
+        return f"{self.event_id}: {self.score} × {self.count}"
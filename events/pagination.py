@@ -0,0 +1,157 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import feed_buckets
+
+
+class EventFeedPagination(BasePagination):
+    """Keyset-пагинация ленты событий по (sort_order, start_time, id)."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is None:
+            now, bucket, after = timezone.now(), 0, None
+        else:
+            now, bucket, after = position['now'], position['bucket'], position['after']
+
+        # Группы ленты читаются по очереди диапазоном индекса (start_time, id),
+        # поэтому страница N стоит столько же, сколько первая.
+        limit = self.page_size + 1
+        rows = []
+        buckets = feed_buckets(now)
+        # Связанные объекты догружаются одним запросом на всю страницу,
+        # а не отдельно для каждой прочитанной группы.
+        prefetch_lookups = queryset._prefetch_related_lookups
+        queryset = queryset.prefetch_related(None)
+        for index in range(bucket, len(buckets)):
+            page = queryset.filter(buckets[index])
+            if index == bucket and after is not None:
+                start_time, pk = after
+                page = page.filter(start_time__gte=start_time).exclude(
+                    start_time=start_time, id__lte=pk
+                )
+            page = page.order_by('start_time', 'id')[:limit - len(rows)]
+            rows.extend((index, event) for event in page)
+            if len(rows) == limit:
+                break
+
+        self.now = now
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_position = rows[-1] if rows else None
+        events = [event for _, event in rows]
+        prefetch_related_objects(events, *prefetch_lookups)
+        return events
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        bucket, event = self.last_position
+        # Быстрый путь списка отдаёт строки .values() вместо объектов.
+        if isinstance(event, dict):
+            cursor = self.encode_cursor(bucket, event['start_time'], event['id'])
+        else:
+            cursor = self.encode_cursor(bucket, event.start_time, event.id)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, bucket, start_time, pk):
+        querystring = parse.urlencode({
+            'b': bucket,
+            't': start_time.isoformat(),
+            'i': pk,
+            'n': self.now.isoformat(),
+        })
+        return b64encode(querystring.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            bucket = int(tokens['b'][0])
+            start_time = parse_datetime(tokens['t'][0])
+            pk = int(tokens['i'][0])
+            now = parse_datetime(tokens['n'][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if start_time is None or now is None or not 0 <= bucket < len(feed_buckets(now)):
+            raise NotFound(self.invalid_cursor_message)
+        return {'now': now, 'bucket': bucket, 'after': (start_time, pk)}
+
+
+class NotificationPagination(CursorPagination):
+    """Курсорная пагинация уведомлений от новых к старым по индексу (user_id, id)."""
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class OrganizerEventPagination(CursorPagination):
+    """Курсорная пагинация кабинета организатора по индексу (organizer, start_time, id)."""
+    ordering = ('-start_time', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class EventSearchPagination(EventFeedPagination):
+    """Страницы выдачи ?q= и ?near= в порядке фильтра, без COUNT по совпадениям."""
+    page_query_param = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        page = request.query_params.get(self.page_query_param, '')
+        self.page = max(int(page), 1) if page.isdigit() else 1
+        offset = (self.page - 1) * self.page_size
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        return rows[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page + 1)
@@ -0,0 +1,36 @@
+from functools import lru_cache
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, TrigramWordSimilarity
+)
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from .models import SEARCH_CONFIG
+
+
+@lru_cache(maxsize=None)
+def trigram_enabled():
+    """Установлено ли pg_trgm: без него поиск обходится без учёта опечаток."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_events(queryset, text):
+    """События по запросу text, от более релевантных к менее.
+
+    Совпадения ищутся по GIN-индексу search_vector, а при наличии pg_trgm —
+    ещё и по триграммам title и location, что прощает опечатки.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    matches = Q(search_vector=query)
+    rank = SearchRank(F('search_vector'), query)
+    if trigram_enabled():
+        matches |= Q(title__trigram_word_similar=text) | Q(location__trigram_word_similar=text)
+        rank = rank + Greatest(
+            TrigramWordSimilarity(text, 'title'),
+            TrigramWordSimilarity(text, 'location')
+        )
+    return queryset.filter(matches).annotate(rank=rank).order_by('-rank', 'start_time', 'id')
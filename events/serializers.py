@@ -1,20 +1,66 @@
 import logging
+from datetime import timedelta
 
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
 
-from .models import Event, Booking, Notification, Rating, Tag
+from .cache import invalidate_events_cache
+from .models import (
+    Event, EventHourlyStats, Booking, Notification, Rating, SeatHold, Tag, Waitlist
+)
 
 
 logger = logging.getLogger(__name__)
 
+def validate_coordinates(latitude, longitude):
+    if (latitude is None) != (longitude is None):
+        raise serializers.ValidationError("Укажите обе координаты или ни одной.")
+
+
+def sparse_fields(query_params, available):
+    """Поля ответа по ?fields= или ?omit= (через запятую) в порядке available."""
+    requested = {
+        param: [name.strip() for name in query_params[param].split(',') if name.strip()]
+        for param in ('fields', 'omit') if param in query_params
+    }
+    if len(requested) > 1:
+        raise serializers.ValidationError({'fields': "Укажите либо fields, либо omit."})
+    for param, names in requested.items():
+        unknown = sorted(set(names) - set(available))
+        if unknown:
+            raise serializers.ValidationError({param: f"Неизвестные поля: {', '.join(unknown)}."})
+    if 'fields' in requested:
+        return [name for name in available if name in requested['fields']]
+    return [name for name in available if name not in requested.get('omit', [])]
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе GET только поля из ?fields= или без полей из ?omit=."""
+
+    @classmethod
+    def readable_fields(cls):
+        return [name for name, field in cls().fields.items() if not field.write_only]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return fields
+        selected = sparse_fields(request.query_params, self.readable_fields())
+        return {
+            name: field for name, field in fields.items()
+            if name in selected or field.write_only
+        }
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ['id', 'name']
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     organizer = serializers.ReadOnlyField(source='organizer.username')
     organizer_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source='organizer', write_only=True, required=False
@@ -23,23 +69,31 @@ class EventSerializer(serializers.ModelSerializer):
     tag_ids = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Tag.objects.all(), source='tags', write_only=True, required=False
     )
+    # Есть только в выдаче ?near=.
+    distance_km = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Event
         fields = [
-            'id', 'title', 'description', 'start_time', 'location',
-            'seats', 'status', 'organizer', 'organizer_id', 'created_at', 'tags', 'tag_ids'
+            'id', 'title', 'description', 'start_time', 'location', 'latitude', 'longitude',
+            'distance_km', 'seats', 'status', 'organizer', 'organizer_id', 'created_at',
+            'tags', 'tag_ids'
         ]
         read_only_fields = ['id', 'created_at', 'organizer']
     
     def validate(self, data):
         logger.debug(f"Validated data: {data}")
+        validate_coordinates(
+            data.get('latitude', getattr(self.instance, 'latitude', None)),
+            data.get('longitude', getattr(self.instance, 'longitude', None))
+        )
         return super().validate(data)
 
     def create(self, validated_data):
         tags = validated_data.pop('tags', [])
         event = Event.objects.create(**validated_data)
         event.tags.set(tags)
+        invalidate_events_cache()
         return event
 
     def update(self, instance, validated_data):
@@ -47,12 +101,91 @@ class EventSerializer(serializers.ModelSerializer):
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Пишем только изменённые поля, чтобы не затереть booked_count,
+        # рейтинг и tag_ids, обновлённые параллельно.
+        instance.save(update_fields=list(validated_data))
 
         if tags is not None:
             instance.tags.set(tags)
+        invalidate_events_cache()
         return instance
 
+class EventListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Краткая карточка для списков (?compact=true): без описания, тегов и организатора."""
+
+    class Meta:
+        model = Event
+        fields = ['id', 'title', 'start_time', 'location', 'status']
+        read_only_fields = fields
+
+
+class OrganizerEventSerializer(serializers.ModelSerializer):
+    """Событие в кабинете организатора: счётчики из аннотаций with_organizer_stats."""
+    booked = serializers.IntegerField(read_only=True)
+    held = serializers.IntegerField(read_only=True)
+    remaining = serializers.IntegerField(read_only=True)
+    avg_rating = serializers.FloatField(read_only=True)
+    pending_notifications = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Event
+        fields = [
+            'id', 'title', 'start_time', 'status', 'seats',
+            'booked', 'held', 'remaining', 'avg_rating', 'pending_notifications'
+        ]
+        read_only_fields = fields
+
+
+class CalendarQuerySerializer(serializers.Serializer):
+    """Параметры календаря: даты from и to включительно и размер корзины."""
+    to = serializers.DateField()
+    granularity = serializers.ChoiceField(choices=['day', 'week'], default='day')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # from — ключевое слово Python, поэтому поле объявляется здесь.
+        fields['from'] = serializers.DateField()
+        return fields
+
+    def validate(self, data):
+        if data['from'] > data['to']:
+            raise serializers.ValidationError("Дата from не может быть позже to.")
+        first_day = data['from']
+        if data['granularity'] == 'week':
+            first_day -= timedelta(days=first_day.weekday())
+        days = (data['to'] - first_day).days + 1
+        buckets = -(-days // 7) if data['granularity'] == 'week' else days
+        if buckets > settings.EVENTS_CALENDAR_MAX_BUCKETS:
+            raise serializers.ValidationError(
+                f"Не больше {settings.EVENTS_CALENDAR_MAX_BUCKETS} корзин за запрос."
+            )
+        return data
+
+
+class EventImportSerializer(serializers.ModelSerializer):
+    """Строка импорта: ссылки на организатора и теги проверяются пачкой в сервисе."""
+    organizer_id = serializers.IntegerField(required=False)
+    tag_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = Event
+        fields = [
+            'title', 'description', 'start_time', 'location', 'latitude', 'longitude',
+            'seats', 'status', 'organizer_id', 'tag_ids'
+        ]
+
+    def validate(self, data):
+        validate_coordinates(data.get('latitude'), data.get('longitude'))
+        return data
+
+
+class EventHourlyStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventHourlyStats
+        fields = ['hour', 'bookings', 'cancellations']
+        read_only_fields = fields
+
+
 class BookingSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
     event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
@@ -63,6 +196,48 @@ class BookingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'user']
 
 
+class BookingBatchSerializer(serializers.Serializer):
+    """Групповая бронь: event с users или несколько events для себя."""
+    event = serializers.IntegerField(required=False)
+    users = serializers.ListField(
+        child=serializers.IntegerField(), required=False,
+        allow_empty=False, max_length=settings.BOOKING_BATCH_MAX_SIZE
+    )
+    events = serializers.ListField(
+        child=serializers.IntegerField(), required=False,
+        allow_empty=False, max_length=settings.BOOKING_BATCH_MAX_SIZE
+    )
+
+    def validate(self, data):
+        if ('event' in data) == ('events' in data):
+            raise serializers.ValidationError("Укажите либо event, либо events.")
+        if 'users' in data and 'events' in data:
+            raise serializers.ValidationError("Список users допустим только вместе с event.")
+        return data
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ['token', 'event', 'expires_at']
+        read_only_fields = fields
+
+
+class SeatHoldConfirmSerializer(serializers.Serializer):
+    token = serializers.UUIDField()
+
+
+class WaitlistSerializer(serializers.ModelSerializer):
+    user = serializers.ReadOnlyField(source='user.username')
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    position = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Waitlist
+        fields = ['id', 'user', 'event', 'position', 'created_at']
+        read_only_fields = ['id', 'created_at', 'user']
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
     event = serializers.PrimaryKeyRelatedField(
@@ -71,12 +246,89 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ['id', 'user', 'event', 'message', 'created_at']
-        read_only_fields = ['id', 'created_at', 'user', 'event', 'message']
+        fields = ['id', 'user', 'event', 'message', 'created_at', 'read_at']
+        read_only_fields = ['id', 'created_at', 'user', 'event', 'message', 'read_at']
 
 
 class RatingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rating
         fields = ['id', 'event', 'user', 'score', 'created_at']
-        read_only_fields = ['user', 'created_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at']
+
+
+class ValuesSerializer:
+    """Read-only вывод DRF-сериализатора по строкам .values(), без объектов моделей.
+
+    Колонки и преобразования полей выбираются один раз по исходному
+    сериализатору, поэтому результат совпадает с его .data, а на строку
+    остаётся чтение словаря и to_representation только там, где он меняет значение.
+    """
+    # Значения этих полей из базы DRF отдаёт как есть.
+    passthrough = (
+        serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+        serializers.IntegerField, serializers.ReadOnlyField,
+    )
+
+    def __init__(self, serializer, queryset):
+        model = queryset.model
+        self.available = (
+            {field.name for field in model._meta.concrete_fields}
+            | {field.attname for field in model._meta.concrete_fields}
+            | set(queryset.query.annotations)
+        )
+        self.mappers = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            mapper = self.compile(name, field)
+            if mapper is not None:
+                self.mappers.append(mapper)
+
+    def compile(self, name, field):
+        """(имя, колонка values(), преобразование или None) для поля сериализатора."""
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return name, f'{field.source}_id', None
+        if isinstance(field, serializers.BaseSerializer):
+            raise TypeError(f"Поле {name}: вложенные сериализаторы задаются в подклассе.")
+        lookup = field.source.replace('.', '__')
+        if '__' not in lookup and lookup not in self.available:
+            # Как и DRF, пропускаем read-only поле, которого нет у объекта (distance_km).
+            return None
+        convert = None if isinstance(field, self.passthrough) else field.to_representation
+        return name, lookup, convert
+
+    def values(self, queryset, *extra):
+        """Строки для to_representation; extra — колонки, нужные пагинации."""
+        lookups = dict.fromkeys([*extra, *(lookup for _, lookup, _ in self.mappers)])
+        return queryset.prefetch_related(None).values(*lookups)
+
+    def to_representation(self, rows):
+        mappers = self.mappers
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, convert in mappers:
+                value = row[lookup]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class EventValuesSerializer(ValuesSerializer):
+    """Строки событий: теги из отсортированного Event.tag_ids, названия — одним запросом."""
+
+    def compile(self, name, field):
+        if name == 'tags':
+            return name, 'tag_ids', self.tags_representation
+        return super().compile(name, field)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        if any(name == 'tags' for name, _, _ in self.mappers):
+            tag_ids = {pk for row in rows for pk in row['tag_ids']}
+            self.tag_names = dict(Tag.objects.filter(pk__in=tag_ids).values_list('id', 'name'))
+        return super().to_representation(rows)
+
+    def tags_representation(self, tag_ids):
+        return [{'id': pk, 'name': self.tag_names[pk]} for pk in tag_ids]
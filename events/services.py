@@ -1,8 +1,23 @@
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, DateField, F, Window
+from django.db.models.functions import RowNumber, Trunc
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from rest_framework import status
 
+from .cache import calendar_bucket_keys, invalidate_events_cache
 from .mixins import ErrorHandlingMixin
+from .models import (
+    Booking, Event, EventHourlyStats, EventRatingStats, SeatHold, Tag, Waitlist
+)
+from .serializers import EventHourlyStatsSerializer, EventImportSerializer
 
 class EventService(ErrorHandlingMixin):
     def deny_if_not_organizer(self, request, event):
@@ -28,4 +43,385 @@ class EventService(ErrorHandlingMixin):
         return (
             self.deny_if_not_organizer(request, event) 
             or self.deny_if_too_late_to_delete(event)
-        )
\ No newline at end of file
+        )
+
+
+class BookingService(ErrorHandlingMixin):
+    def reserve_seat(self, event_id):
+        """Занимает место одним условным UPDATE, если оно ещё свободно."""
+        updated = Event.objects.filter(
+            pk=event_id,
+            booked_count__lt=F('seats')
+        ).update(booked_count=F('booked_count') + 1)
+        if updated:
+            invalidate_events_cache()
+        return updated == 1
+
+    def reserve_seats(self, event_ids, count):
+        """Занимает count мест на каждом событии одним UPDATE; True, если хватило всем."""
+        updated = Event.objects.filter(
+            pk__in=event_ids,
+            booked_count__lte=F('seats') - count
+        ).update(booked_count=F('booked_count') + count)
+        if updated:
+            invalidate_events_cache()
+        return updated == len(event_ids)
+
+    def promote_from_waitlist(self, event_id):
+        """Отдаёт освободившееся место первому в очереди; вызывать внутри транзакции.
+
+        Голова очереди блокируется с SKIP LOCKED, поэтому параллельные отмены
+        продвигают разных ожидающих. Возвращает запись очереди или None.
+        На отменённое, завершённое или скоро начинающееся событие никого
+        не записываем: очередь очищается.
+        """
+        queue = Waitlist.objects.filter(event_id=event_id).select_related('event').order_by('id')
+        while True:
+            entry = queue.select_for_update(skip_locked=True, of=('self',)).first()
+            if entry is None:
+                return None
+            if entry.event.status != 'planned' or not entry.event.can_book():
+                queue.delete()
+                return None
+            entry.delete()
+            try:
+                with transaction.atomic():
+                    Booking.objects.create(user_id=entry.user_id, event_id=event_id)
+            except IntegrityError:
+                # Уже забронировал сам — место достаётся следующему.
+                continue
+            EventStatsService().record_bookings({event_id: 1})
+            return entry
+
+    def hold_seat(self, user, event):
+        """Удерживает место на SEAT_HOLD_TTL_MINUTES; вызывать внутри транзакции.
+
+        Возвращает SeatHold или None, если мест нет. Повторное удержание
+        тем же пользователем вызывает IntegrityError.
+        """
+        with transaction.atomic():
+            hold = SeatHold.objects.create(
+                user=user,
+                event=event,
+                expires_at=timezone.now() + timedelta(minutes=settings.SEAT_HOLD_TTL_MINUTES)
+            )
+        if not self.reserve_seat(event.id):
+            return None
+        return hold
+
+    def consume_holds(self, user_ids, event_ids):
+        """Снимает удержания пользователей на события, чьи места переходят в брони.
+
+        Удержание, даже просроченное, но ещё не снятое, уже учтено в booked_count.
+        Один DELETE ... RETURNING; возвращает Counter {event_id: снято}.
+        """
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {quote(SeatHold._meta.db_table)}
+                WHERE user_id = ANY(%s) AND event_id = ANY(%s)
+                RETURNING event_id
+                """,
+                [list(user_ids), list(event_ids)]
+            )
+            return Counter(event_id for event_id, in cursor.fetchall())
+
+    def release_holds(self, counts):
+        """Возвращает места снятых удержаний {event_id: число}: сначала ожидающим.
+
+        Вызывать в той же транзакции, что и удаление удержаний.
+        Возвращает продвинутые записи листа ожидания.
+        """
+        promoted = []
+        for event_id, count in counts.items():
+            freed = count
+            while freed:
+                entry = self.promote_from_waitlist(event_id)
+                if entry is None:
+                    break
+                promoted.append(entry)
+                freed -= 1
+            if freed:
+                Event.objects.filter(
+                    pk=event_id,
+                    booked_count__gte=freed
+                ).update(booked_count=F('booked_count') - freed)
+        invalidate_events_cache()
+        return promoted
+
+    def release_seat(self, event_id):
+        """Возвращает место в счётчик после отмены брони."""
+        Event.objects.filter(
+            pk=event_id,
+            booked_count__gt=0
+        ).update(booked_count=F('booked_count') - 1)
+        invalidate_events_cache()
+
+
+class RatingService:
+    def apply_score(self, event_id, score, count_delta):
+        """Добавляет (count_delta=1) или убирает (-1) оценку score из агрегатов события."""
+        Event.objects.filter(pk=event_id).update(
+            rating_sum=F('rating_sum') + score * count_delta,
+            rating_count=F('rating_count') + count_delta
+        )
+        EventStatsService().record_rating(event_id, score, count_delta)
+        invalidate_events_cache()
+
+
+class EventStatsService:
+    """Роллапы статистики события: почасовые брони/отмены и гистограмма оценок."""
+
+    def record_bookings(self, counts):
+        """Учитывает новые брони {event_id: число} в текущем часе."""
+        hour = self.current_hour()
+        self.increment(EventHourlyStats, ['event', 'hour'], [
+            {'event_id': event_id, 'hour': hour, 'bookings': count}
+            for event_id, count in counts.items()
+        ])
+
+    def record_cancellation(self, event_id):
+        self.increment(EventHourlyStats, ['event', 'hour'], [
+            {'event_id': event_id, 'hour': self.current_hour(), 'cancellations': 1}
+        ])
+
+    def record_rating(self, event_id, score, count_delta):
+        if count_delta < 0:
+            # Снимаемая оценка уже учтена, поэтому строка гистограммы есть.
+            EventRatingStats.objects.filter(event_id=event_id, score=score).update(
+                count=F('count') + count_delta
+            )
+        else:
+            self.increment(EventRatingStats, ['event', 'score'], [
+                {'event_id': event_id, 'score': score, 'count': count_delta}
+            ])
+
+    def current_hour(self):
+        return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def increment(self, model, unique_fields, rows):
+        """Прибавляет счётчики rows к строкам роллапа одним INSERT ... ON CONFLICT DO UPDATE.
+
+        Недостающие строки создаются тем же запросом, без гонки между UPDATE и INSERT.
+        """
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        keys = [model._meta.get_field(name).column for name in unique_fields]
+        counters = [field.column for field in fields if field.column not in keys]
+        row_sql = '(%s)' % ', '.join(['%s'] * len(fields))
+        sql = (
+            'INSERT INTO {table} ({columns}) VALUES {values} '
+            'ON CONFLICT ({keys}) DO UPDATE SET {counters}'
+        ).format(
+            table=table,
+            columns=', '.join(quote(field.column) for field in fields),
+            values=', '.join([row_sql] * len(rows)),
+            keys=', '.join(quote(column) for column in keys),
+            counters=', '.join(
+                f'{quote(column)} = {table}.{quote(column)} + EXCLUDED.{quote(column)}'
+                for column in counters
+            ),
+        )
+        params = [row.get(field.attname, 0) for row in rows for field in fields]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def stats(self, event):
+        """Статистика события из роллапов: время ответа зависит от числа часов, а не броней."""
+        histogram = dict(
+            EventRatingStats.objects.filter(event=event).values_list('score', 'count')
+        )
+        hourly = EventHourlyStats.objects.filter(event=event).order_by('hour')
+        # booked_count включает действующие удержания: они тоже занимают места.
+        fill = 100 * event.booked_count / event.seats if event.seats else 0
+        return {
+            'event': event.id,
+            'seats': event.seats,
+            'booked': event.booked_count,
+            'fill_percent': round(fill, 1),
+            'rating': {
+                'count': event.rating_count,
+                'average': event.rating_sum / event.rating_count if event.rating_count else None,
+                'histogram': {str(score): histogram.get(score, 0) for score in range(1, 6)},
+            },
+            'hourly': EventHourlyStatsSerializer(hourly, many=True).data,
+        }
+
+
+class EventImportService:
+    """Массовый импорт событий из NDJSON: проверка и запись пачками."""
+    max_errors = 100
+
+    def __init__(self, organizer, batch_size=None):
+        self.organizer = organizer
+        self.batch_size = batch_size or settings.EVENTS_BULK_BATCH_SIZE
+
+    def import_lines(self, lines):
+        """Создаёт события из строк NDJSON по принципу «всё или ничего».
+
+        Возвращает (число созданных, ошибки по номерам строк).
+        """
+        created, errors = 0, []
+        with transaction.atomic():
+            for batch in self.batches(lines):
+                rows = self.validate(batch, errors)
+                if len(errors) >= self.max_errors:
+                    break
+                # После первой ошибки только проверяем остаток, чтобы вернуть все ошибки.
+                if not errors:
+                    created += self.write(rows)
+            if errors:
+                transaction.set_rollback(True)
+                return 0, errors[:self.max_errors]
+            if created:
+                invalidate_events_cache()
+        return created, []
+
+    def batches(self, lines):
+        batch = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            batch.append((number, line))
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def validate(self, batch, errors):
+        """Проверяет пачку строк; ссылки на пользователей и теги — одним запросом на пачку."""
+        rows = []
+        for number, line in batch:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                errors.append({'line': number, 'errors': {'detail': ['Некорректный JSON.']}})
+                continue
+            serializer = EventImportSerializer(data=data)
+            if not serializer.is_valid():
+                errors.append({'line': number, 'errors': serializer.errors})
+                continue
+            rows.append((number, serializer.validated_data))
+
+        tag_ids = {pk for _, row in rows for pk in row.get('tag_ids', [])}
+        user_ids = {row['organizer_id'] for _, row in rows if 'organizer_id' in row}
+        known_tags = set(Tag.objects.filter(pk__in=tag_ids).values_list('pk', flat=True))
+        known_users = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+
+        valid = []
+        for number, row in rows:
+            row_errors = {}
+            missing = sorted(set(row.get('tag_ids', [])) - known_tags)
+            if missing:
+                row_errors['tag_ids'] = [f"Теги не найдены: {', '.join(map(str, missing))}."]
+            if row.get('organizer_id', self.organizer.pk) not in known_users | {self.organizer.pk}:
+                row_errors['organizer_id'] = ['Пользователь не найден.']
+            if row_errors:
+                errors.append({'line': number, 'errors': row_errors})
+            else:
+                valid.append(row)
+        return valid
+
+    def write(self, rows):
+        """Один bulk_create событий и один — строк связующей таблицы тегов."""
+        events = []
+        for row in rows:
+            row = dict(row)
+            tag_ids = sorted(set(row.pop('tag_ids', [])))
+            organizer_id = row.pop('organizer_id', self.organizer.pk)
+            events.append(Event(organizer_id=organizer_id, tag_ids=tag_ids, **row))
+        Event.objects.bulk_create(events)
+
+        through = Event.tags.through
+        through.objects.bulk_create([
+            through(event_id=event.pk, tag_id=tag_id)
+            for event in events
+            for tag_id in event.tag_ids
+        ])
+        return len(events)
+
+
+class EventExportService:
+    """Выгрузка каталога в NDJSON с постоянным расходом памяти."""
+    fields = [
+        'id', 'title', 'description', 'start_time', 'location', 'latitude', 'longitude',
+        'seats', 'status', 'organizer_id', 'tag_ids'
+    ]
+
+    def export_lines(self, queryset):
+        """Строки NDJSON в формате, который принимает EventImportService."""
+        rows = queryset.order_by('id').values(*self.fields)
+        for row in rows.iterator(chunk_size=settings.EVENTS_BULK_BATCH_SIZE):
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b'\n'
+
+
+class EventCalendarService:
+    """Календарь: число событий и их краткие карточки по дням или неделям."""
+    periods = {'day': timedelta(days=1), 'week': timedelta(weeks=1)}
+    fields = ['id', 'title', 'start_time', 'status']
+
+    def __init__(self, granularity):
+        self.granularity = granularity
+        self.period = self.periods[granularity]
+
+    def bucket_starts(self, first_day, last_day):
+        """Начала корзин, покрывающих даты с first_day по last_day включительно."""
+        if self.granularity == 'week':
+            first_day -= timedelta(days=first_day.weekday())
+        starts = []
+        while first_day <= last_day:
+            starts.append(first_day)
+            first_day += self.period
+        return starts
+
+    def buckets(self, first_day, last_day):
+        """Корзины диапазона: из кеша, а недостающие — одним запросом к базе."""
+        starts = self.bucket_starts(first_day, last_day)
+        keys = calendar_bucket_keys(self.granularity, starts)
+        cached = cache.get_many(keys.values())
+        missing = [start for start in starts if keys[start] not in cached]
+        if missing:
+            found = self.read(missing[0], missing[-1] + self.period)
+            fresh = {
+                keys[start]: found.get(start) or {'start': start, 'count': 0, 'events': []}
+                for start in missing
+            }
+            cache.set_many(fresh, settings.EVENTS_CACHE_TIMEOUT)
+            cached.update(fresh)
+        return [cached[keys[start]] for start in starts]
+
+    def read(self, first_day, end_day):
+        """Корзины [first_day, end_day): счётчик и первые события каждой."""
+        found = {}
+        for row in self.rows(first_day, end_day):
+            start = row.pop('bucket')
+            count = row.pop('bucket_count')
+            found.setdefault(start, {'start': start, 'count': count, 'events': []})['events'].append(row)
+        return found
+
+    def rows(self, first_day, end_day):
+        """Строки корзин [first_day, end_day) из индекса start_time, без JOIN-ов броней и оценок.
+
+        Число событий в корзине и номер события в ней считают оконные функции.
+        """
+        bucket = Trunc('start_time', self.granularity, output_field=DateField())
+        return (
+            Event.objects.filter(
+                start_time__gte=self.midnight(first_day),
+                start_time__lt=self.midnight(end_day)
+            )
+            .annotate(
+                bucket=bucket,
+                bucket_count=Window(Count('id'), partition_by=[bucket]),
+                position=Window(RowNumber(), partition_by=[bucket], order_by=['start_time', 'id'])
+            )
+            .filter(position__lte=settings.EVENTS_CALENDAR_BUCKET_SIZE)
+            .order_by('start_time', 'id')
+            .values('bucket', 'bucket_count', *self.fields)
+        )
+
+    def midnight(self, day):
+        return timezone.make_aware(datetime.combine(day, time.min))
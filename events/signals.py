@@ -0,0 +1,34 @@
+from django.db.models import F, Func, Value
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from .models import Event, Tag
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def sync_event_tag_ids(sender, instance, action, reverse, pk_set, **kwargs):
+    """Обновляет Event.tag_ids после любого изменения связи события с тегами."""
+    if action == 'pre_clear' and reverse:
+        # После очистки со стороны тега уже не узнать, каких событий она коснулась.
+        instance._cleared_event_ids = list(instance.events.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # Держим копию и в самом объекте, чтобы последующий save() её не затёр.
+        instance.tag_ids = sorted(instance.tags.values_list('pk', flat=True))
+        Event.objects.filter(pk=instance.pk).update(tag_ids=instance.tag_ids)
+        return
+    if action == 'post_clear':
+        event_ids = instance.__dict__.pop('_cleared_event_ids', [])
+    else:
+        event_ids = pk_set
+    Event.objects.filter(pk__in=event_ids).refresh_tag_ids()
+
+
+@receiver(post_delete, sender=Tag)
+def drop_deleted_tag(sender, instance, **kwargs):
+    """Убирает id удалённого тега из tag_ids событий."""
+    Event.objects.filter(tag_ids__contains=[instance.pk]).update(
+        tag_ids=Func(F('tag_ids'), Value(instance.pk), function='array_remove')
+    )
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.contrib.auth import get_user
+from django.utils.module_loading import import_string
+
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/api/notifications/stream/'
+# Сигнал потоку закрыться: клиент отключился или не успевает читать.
+CLOSE = object()
+
+
+class LocalBroker:
+    """Pub/sub уведомлений внутри процесса: по очереди asyncio на подключение."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is None:
+            return
+        subscribers.difference_update({item for item in subscribers if item[1] is queue})
+        if not subscribers:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id, payload):
+        """Потокобезопасно доставляет payload всем подключениям пользователя."""
+        for loop, queue in list(self._subscribers.get(user_id, ())):
+            loop.call_soon_threadsafe(self._deliver, queue, payload)
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscribers
+
+    def connection_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def close_all(self, loop):
+        """Закрывает все потоки цикла loop: клиенты переподключатся с Last-Event-ID."""
+        for subscribers in list(self._subscribers.values()):
+            for subscriber_loop, queue in list(subscribers):
+                if subscriber_loop is loop:
+                    self._close(queue)
+
+    @classmethod
+    def _deliver(cls, queue, payload):
+        # Переполненную очередь закрываем: клиент переподключится
+        # с Last-Event-ID и дочитает пропущенное из базы.
+        if queue.full():
+            cls._close(queue)
+        else:
+            queue.put_nowait(payload)
+
+    @staticmethod
+    def _close(queue):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(CLOSE)
+
+
+class RedisBroker(LocalBroker):
+    """Локальный брокер, получающий публикации других процессов через Redis."""
+    channel = 'notifications'
+
+    def __init__(self, url):
+        import redis
+
+        super().__init__()
+        self.url = url
+        self._redis = redis.Redis.from_url(url)
+        self._listeners = {}
+
+    def has_subscribers(self, user_id):
+        # Подписчики могут быть в любом процессе, поэтому публикуем всё.
+        return True
+
+    def publish(self, user_id, payload):
+        self._redis.publish(self.channel, json.dumps({'user': user_id, 'payload': payload}))
+
+    def subscribe(self, user_id):
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        # Завершившийся по непредвиденной ошибке слушатель запускаем заново.
+        if listener is None or listener.done():
+            self._listeners[loop] = loop.create_task(self._listen())
+        return super().subscribe(user_id)
+
+    async def _listen(self):
+        """Пересылает публикации из Redis, переподключаясь с растущей паузой.
+
+        Пока соединения нет, публикации теряются, поэтому при разрыве и после
+        переподключения потоки цикла закрываются: клиенты вернутся
+        с Last-Event-ID и дочитают пропущенное из базы.
+        """
+        import redis.asyncio
+
+        loop = asyncio.get_running_loop()
+        delay = 0
+        while True:
+            try:
+                client = redis.asyncio.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    if delay:
+                        self.close_all(loop)
+                        delay = 0
+                    async for message in pubsub.listen():
+                        if message['type'] != 'message':
+                            continue
+                        data = json.loads(message['data'])
+                        super().publish(data['user'], data['payload'])
+            except (redis.RedisError, OSError) as error:
+                logger.warning("Поток уведомлений потерял соединение с Redis: %s", error)
+            self.close_all(loop)
+            delay = min(
+                delay * 2 or settings.NOTIFICATION_STREAM_RECONNECT_DELAY,
+                settings.NOTIFICATION_STREAM_RECONNECT_MAX_DELAY
+            )
+            await asyncio.sleep(delay)
+
+
+_broker = None
+
+
+def get_broker():
+    """Брокер процесса: Redis, если задан NOTIFICATION_STREAM_REDIS_URL, иначе локальный."""
+    global _broker
+    if _broker is None:
+        url = settings.NOTIFICATION_STREAM_REDIS_URL
+        _broker = RedisBroker(url) if url else LocalBroker()
+    return _broker
+
+
+def publish_notifications(notifications):
+    """Отправляет уведомления в поток получателей после фиксации транзакции."""
+    broker = get_broker()
+    subscribed = [n for n in notifications if broker.has_subscribers(n.user_id)]
+    if not subscribed:
+        return
+
+    def publish():
+        for notification in subscribed:
+            broker.publish(notification.user_id, NotificationSerializer(notification).data)
+
+    transaction.on_commit(publish)
+
+
+def format_event(payload):
+    data = json.dumps(payload, ensure_ascii=False)
+    return f"id: {payload['id']}\nevent: notification\ndata: {data}\n\n".encode()
+
+
+@sync_to_async
+def authenticate(scope):
+    """Находит пользователя по сессионной cookie, как AuthenticationMiddleware."""
+    headers = dict(scope['headers'])
+    cookie = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    engine = import_string(f'{settings.SESSION_ENGINE}.SessionStore')
+    session = engine(morsel.value if morsel else None)
+    return get_user(SimpleNamespace(session=session))
+
+
+@sync_to_async
+def missed_notifications(user_id, last_id, limit):
+    """Страница уведомлений новее last_id для дочитывания после переподключения."""
+    queryset = (
+        Notification.objects.filter(user_id=user_id, id__gt=last_id)
+        .select_related('user')
+        .order_by('id')[:limit]
+    )
+    return [NotificationSerializer(notification).data for notification in queryset]
+
+
+def last_event_id(scope):
+    headers = dict(scope['headers'])
+    value = headers.get(b'last-event-id', b'').decode('latin-1')
+    if not value:
+        value = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('last_event_id', [''])[0]
+    return int(value) if value.isdigit() else None
+
+
+async def send_json(send, status_code, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status_code,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(body, ensure_ascii=False).encode()})
+
+
+async def notification_stream(scope, receive, send):
+    """ASGI-приложение Server-Sent Events с новыми уведомлениями пользователя."""
+    user = await authenticate(scope)
+    if not user.is_authenticated:
+        await send_json(send, 401, {'detail': 'Учетные данные не были предоставлены.'})
+        return
+
+    broker = get_broker()
+    queue = broker.subscribe(user.id)
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(CLOSE)
+
+    watcher = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        # Подписка оформлена до дочитывания, поэтому разрыва нет,
+        # а повторы отсекаются по последнему отправленному id.
+        sent_id = last_event_id(scope)
+        page_size = settings.NOTIFICATION_STREAM_QUEUE_SIZE
+        while sent_id is not None:
+            missed = await missed_notifications(user.id, sent_id, page_size)
+            for payload in missed:
+                await send({'type': 'http.response.body', 'body': format_event(payload), 'more_body': True})
+                sent_id = payload['id']
+            if len(missed) < page_size:
+                break
+
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+                continue
+            if payload is CLOSE:
+                break
+            if sent_id is not None and payload['id'] <= sent_id:
+                continue
+            await send({'type': 'http.response.body', 'body': format_event(payload), 'more_body': True})
+            sent_id = payload['id']
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        watcher.cancel()
+        broker.unsubscribe(user.id, queue)
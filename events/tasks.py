@@ -1,32 +1,191 @@
+from collections import Counter
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.db.models import Q
+from kombu.exceptions import OperationalError as BrokerError
 from django.utils import timezone
-from .models import Event, Notification, Booking
+from .cache import invalidate_events_cache, invalidate_unread_counts
+from .models import Event, Notification, NotificationOutbox, SeatHold
+from .services import BookingService
+from .streams import publish_notifications
 from django.contrib.auth.models import User
-from django.core.exceptions import ObjectDoesNotExist
 
-@shared_task
+# Сбои базы и брокера переживаем повторами с растущей паузой и разбросом,
+# чтобы после восстановления воркеры не пришли все разом.
+RETRY_POLICY = {
+    'autoretry_for': (OperationalError, BrokerError),
+    'retry_backoff': 2,
+    'retry_backoff_max': 300,
+    'retry_jitter': True,
+    'max_retries': 8,
+}
+
+
+def create_notifications(user_ids, event_id, message):
+    """Создаёт уведомления существующим пользователям пачками bulk_create."""
+    if not Event.objects.filter(pk=event_id).exists():
+        print(f"[ERROR] Object not found: event {event_id}")
+        return []
+    requested = list(dict.fromkeys(user_ids))
+    existing = dict(User.objects.filter(pk__in=requested).values_list('pk', 'username'))
+    missing = [user_id for user_id in requested if user_id not in existing]
+    if missing:
+        print(f"[ERROR] Object not found: users {missing}")
+    # Все пачки в одной транзакции: сбой посередине не оставит части
+    # уведомлений, которую повтор задачи продублировал бы.
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user=User(pk=user_id, username=existing[user_id]),
+                    event_id=event_id,
+                    message=message
+                )
+                for user_id in requested if user_id in existing
+            ],
+            batch_size=settings.NOTIFICATION_BATCH_SIZE
+        )
+    invalidate_unread_counts(existing)
+    publish_notifications(created)
+    return created
+
+
+# Уведомления создаются одной транзакцией, поэтому повтор после ошибки базы
+# безопасен. А вот повторная выдача после коммита (acks_late) их задвоила бы:
+# эти задачи подтверждаются при получении.
+@shared_task(acks_late=False, **RETRY_POLICY)
 def notify_user(user_id, event_id, message):
     print(f"[STARTING TASK] Notify user {user_id} for event {event_id}")
-    try:
-        user = User.objects.get(pk=user_id)
-        event = Event.objects.get(pk=event_id)
-        Notification.objects.create(user=user, event=event, message=message)
-        print(f"[NOTIFY] {user.username}: {message}")
-    except ObjectDoesNotExist as e:
-        print(f"[ERROR] Object not found: {e}")
-        return
-
-@shared_task
-def complete_old_events():
-    now = timezone.now()
+    if create_notifications([user_id], event_id, message):
+        print(f"[NOTIFY] user {user_id}: {message}")
+
+
+@shared_task(acks_late=False, **RETRY_POLICY)
+def notify_users(user_ids, event_id, message):
+    print(f"[STARTING TASK] Notify {len(user_ids)} users for event {event_id}")
+    created = create_notifications(user_ids, event_id, message)
+    print(f"[NOTIFY] {len(created)} users: {message}")
+    return len(created)
+
+
+@shared_task(**RETRY_POLICY)
+def complete_old_events(batch_size=None):
+    """Завершает прошедшие события пачками и возвращает их id."""
+    batch_size = batch_size or settings.EVENTS_COMPLETE_BATCH_SIZE
+    cutoff = timezone.now() - timezone.timedelta(hours=2)
     outdated_events = Event.objects.filter(
         status='planned',
-        start_time__lt=now - timezone.timedelta(hours=2)
-    )
-    if outdated_events.exists():
-        for event in outdated_events:
-            event.status = 'completed'
-            event.save()
-        print(f"[COMPLETE EVENTS] {len(outdated_events)} events marked as completed.")
+        start_time__lt=cutoff
+    ).order_by('start_time')
+
+    completed_ids = []
+    while True:
+        with transaction.atomic():
+            batch = list(
+                outdated_events.select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            Event.objects.filter(id__in=batch).update(status='completed')
+        completed_ids.extend(batch)
+
+    if completed_ids:
+        invalidate_events_cache()
+        print(f"[COMPLETE EVENTS] {len(completed_ids)} events marked as completed.")
     else:
         print("[COMPLETE EVENTS] No outdated events found.")
+    return completed_ids
+
+
+def notify_promoted(entries):
+    """Пишет в outbox уведомления продвинутым из листа ожидания; вызывать в транзакции."""
+    for entry in entries:
+        NotificationOutbox.objects.enqueue(
+            [entry.user_id],
+            entry.event_id,
+            f"Освободилось место, вы записаны на мероприятие: {entry.event.title}"
+        )
+
+
+@shared_task(**RETRY_POLICY)
+def release_expired_holds(batch_size=None):
+    """Снимает просроченные удержания мест пачками и возвращает их число."""
+    batch_size = batch_size or settings.SEAT_HOLD_SWEEP_BATCH_SIZE
+    booking_service = BookingService()
+    released, promoted = 0, []
+    while True:
+        with transaction.atomic():
+            expired = list(
+                SeatHold.objects.filter(expires_at__lte=timezone.now())
+                .order_by('expires_at')
+                .select_for_update(skip_locked=True)
+                .values_list('id', 'event_id')[:batch_size]
+            )
+            if not expired:
+                break
+            SeatHold.objects.filter(id__in=[pk for pk, _ in expired]).delete()
+            batch_promoted = booking_service.release_holds(Counter(event_id for _, event_id in expired))
+            notify_promoted(batch_promoted)
+        released += len(expired)
+        promoted += batch_promoted
+
+    print(f"[RELEASE HOLDS] {released} expired holds released, {len(promoted)} promoted.")
+    return released
+
+
+@shared_task(**RETRY_POLICY)
+def relay_notification_outbox(batch_size=None):
+    """Публикует новые записи outbox пачками задач deliver_outbox."""
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.NOTIFICATION_OUTBOX_REDELIVERY_TIMEOUT)
+    # Опубликованное, но за таймаут не доставленное (потеря в брокере) — снова.
+    pending = NotificationOutbox.objects.filter(
+        Q(dispatched_at__isnull=True) | Q(dispatched_at__lt=stale)
+    ).order_by('id')
+
+    published = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                pending.select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            NotificationOutbox.objects.filter(id__in=ids).update(dispatched_at=now)
+        deliver_outbox.delay(ids)
+        published += len(ids)
+    return published
+
+
+@shared_task(**RETRY_POLICY)
+def deliver_outbox(outbox_ids):
+    """Создаёт уведомления из записей outbox и удаляет их в одной транзакции.
+
+    Повторная доставка тех же id ничего не создаст: записи уже удалены
+    или заблокированы параллельной доставкой.
+    """
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects.filter(id__in=outbox_ids)
+            .select_related('user')
+            .select_for_update(skip_locked=True, of=('self',))
+        )
+        if not entries:
+            return 0
+        created = Notification.objects.bulk_create(
+            [
+                Notification(user=entry.user, event_id=entry.event_id, message=entry.message)
+                for entry in entries
+            ],
+            batch_size=settings.NOTIFICATION_BATCH_SIZE
+        )
+        NotificationOutbox.objects.filter(id__in=[entry.id for entry in entries]).delete()
+        publish_notifications(created)
+    invalidate_unread_counts({entry.user_id for entry in entries})
+    return len(created)
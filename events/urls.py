@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import EventViewSet, BookingViewSet, NotificationViewSet, RatingViewSet
+from .views import EventViewSet, BookingViewSet, NotificationViewSet, RatingViewSet, WaitlistViewSet
 
 
 router = DefaultRouter()
@@ -9,6 +9,7 @@ router.register(r'events', EventViewSet, basename='event')
 router.register(r'bookings', BookingViewSet, basename='booking')
 router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'ratings', RatingViewSet, basename='rating')
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
 
 urlpatterns = [
     path('', include(router.urls)),
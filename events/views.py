@@ -1,42 +1,94 @@
-from django.db.models import Avg, Count, Case, When, Value, IntegerField, Q
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from rest_framework import viewsets, permissions, status
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import serializers
 
+from .cache import get_unread_count, invalidate_events_cache, invalidate_unread_counts
 from .filters import EventFilter
-from .mixins import ErrorHandlingMixin
-from .models import Event, Booking, Notification, Rating
-from .serializers import EventSerializer, BookingSerializer, NotificationSerializer, RatingSerializer
-from .services import EventService
-from .tasks import notify_user
+from .mixins import CachedReadMixin, ErrorHandlingMixin, ValuesListMixin
+from .models import (
+    Event, Booking, Notification, NotificationOutbox, Rating, SeatHold, Tag, Waitlist
+)
+from .pagination import (
+    EventFeedPagination, EventSearchPagination, NotificationPagination, OrganizerEventPagination
+)
+from .parsers import NDJSONParser
+from .serializers import (
+    BookingBatchSerializer, BookingSerializer, CalendarQuerySerializer, EventListSerializer,
+    EventSerializer, EventValuesSerializer, NotificationSerializer, OrganizerEventSerializer, RatingSerializer,
+    SeatHoldConfirmSerializer, SeatHoldSerializer, WaitlistSerializer, sparse_fields
+)
+from .services import (
+    BookingService, EventCalendarService, EventExportService, EventImportService,
+    EventService, EventStatsService, RatingService
+)
+from .tasks import notify_promoted
 
 
-class EventViewSet(viewsets.ModelViewSet):
+EVENT_COLUMNS = {field.name for field in Event._meta.concrete_fields}
+
+
+class EventViewSet(CachedReadMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = EventSerializer
+    values_serializer_class = EventValuesSerializer
+    values_extra_lookups = ('id', 'start_time')
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_class = EventFilter
+    pagination_class = EventFeedPagination
 
     def get_event_service(self):
         return EventService()
 
+    @property
+    def paginator(self):
+        """Выдача ?q= и ?near= листается по релевантности и расстоянию, остальное — лентой."""
+        params = self.request.query_params
+        if not hasattr(self, '_paginator') and (params.get('q', '').strip() or params.get('near')):
+            self._paginator = EventSearchPagination()
+        return super().paginator
+
+    def get_serializer_class(self):
+        """Для списка с ?compact=true — краткая карточка вместо полной."""
+        if self.action == 'list' and self.request.query_params.get('compact') in ('1', 'true'):
+            return EventListSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         """Возвращает отсортированный queryset событий с аннотацией."""
         now = timezone.now()
-        queryset = Event.objects.annotate(
-            avg_rating=Avg('ratings__score'),
-            booked=Count('bookings'),
-            sort_order=Case(
-                When(status='planned', start_time__gte=now, then=Value(1)),
-                When(~Q(status='planned'), then=Value(2)),
-                default=Value(3),
-                output_field=IntegerField()
-            )
-        ).order_by('sort_order', 'start_time')
-        return queryset
+        queryset = (
+            Event.objects.with_feed_order(now)
+            .order_by('sort_order', 'start_time', 'id')
+        )
+        if self.action not in ('list', 'retrieve'):
+            return queryset.select_related('organizer').prefetch_related(
+                Prefetch('tags', Tag.objects.order_by('id'))
+            )
+        return self.trim_to_fields(queryset)
+
+    def trim_to_fields(self, queryset):
+        """Читает только колонки и связи, которые попадут в ответ (?fields=, ?omit=, compact)."""
+        serializer_class = self.get_serializer_class()
+        fields = sparse_fields(self.request.query_params, serializer_class.readable_fields())
+        # id и start_time нужны курсору ленты, даже если их нет в ответе.
+        columns = {'id', 'start_time'}
+        for name in fields:
+            if name == 'organizer':
+                queryset = queryset.select_related('organizer')
+                columns.add('organizer__username')
+            elif name == 'tags':
+                # Порядок тегов — по id, как в tag_ids быстрого пути списка.
+                queryset = queryset.prefetch_related(Prefetch('tags', Tag.objects.order_by('id')))
+            elif name in serializer_class.Meta.fields and name in EVENT_COLUMNS:
+                columns.add(name)
+        return queryset.only(*columns)
 
     def destroy(self, request, *args, **kwargs):
         """Удаляет событие с проверкой прав и времени."""
@@ -47,6 +99,10 @@ class EventViewSet(viewsets.ModelViewSet):
             return error
         return super().destroy(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_events_cache()
+
     @action(detail=True, methods=['patch'], permission_classes=[permissions.IsAuthenticated])
     def update_status(self, request, pk=None):
         """Обновляет статус события, доступно только организатору."""
@@ -64,16 +120,80 @@ class EventViewSet(viewsets.ModelViewSet):
                 status.HTTP_400_BAD_REQUEST
             )
 
+        status_changed = event.status != new_status
         event.status = new_status
-        event.save()
+        with transaction.atomic():
+            # Только статус: счётчики мест и рейтинга меняются условными UPDATE.
+            event.save(update_fields=['status'])
+            if status_changed:
+                # Уведомления участникам фиксируются вместе со статусом: повтор
+                # или падение воркера не разошлёт их дважды.
+                NotificationOutbox.objects.enqueue_attendees(
+                    event.id,
+                    f"Статус мероприятия изменён на «{event.get_status_display()}»: {event.title}"
+                )
+        invalidate_events_cache()
         return Response({"status": event.status}, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False, methods=['post'], url_path='import',
+        permission_classes=[permissions.IsAuthenticated], parser_classes=[NDJSONParser]
+    )
+    def bulk_import(self, request):
+        """Создаёт события из тела NDJSON (объект на строку) одной транзакцией."""
+        created, errors = EventImportService(request.user).import_lines(request.data)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"created": created}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def export(self, request):
+        """Потоково выгружает события (с учётом фильтров) в NDJSON."""
+        queryset = self.filter_queryset(Event.objects.all())
+        response = StreamingHttpResponse(
+            EventExportService().export_lines(queryset),
+            content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = 'attachment; filename="events.ndjson"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Число событий и краткие карточки по дням или неделям: ?from=&to=&granularity=."""
+        serializer = CalendarQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        buckets = EventCalendarService(params['granularity']).buckets(params['from'], params['to'])
+        return Response({"granularity": params['granularity'], "buckets": buckets})
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def mine(self, request):
+        """События текущего организатора со всеми счётчиками одним запросом на страницу."""
+        queryset = self.filter_queryset(
+            Event.objects.filter(organizer=request.user).with_organizer_stats()
+        )
+        paginator = OrganizerEventPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(OrganizerEventSerializer(page, many=True).data)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def stats(self, request, pk=None):
+        """Почасовые брони и отмены, заполненность и гистограмма оценок для организатора."""
+        event = self.get_object()
+        error = self.get_event_service().deny_if_not_organizer(request, event)
+        if error:
+            return error
+        return Response(EventStatsService().stats(event))
+
 
 class RatingViewSet(viewsets.ModelViewSet):
     """Управление оценками событий."""
     serializer_class = RatingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_rating_service(self):
+        return RatingService()
+
     def get_queryset(self):
         """Возвращает оценки текущего пользователя."""
         return Rating.objects.filter(user=self.request.user)
@@ -89,46 +209,260 @@ class RatingViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError(
                 "Можно оценивать только свои посещенные события."
             )
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            rating = serializer.save(user=self.request.user)
+            self.get_rating_service().apply_score(rating.event_id, rating.score, 1)
+
+    def perform_update(self, serializer):
+        """Обновляет оценку и переносит разницу в агрегаты события."""
+        rating_service = self.get_rating_service()
+        old_event_id, old_score = serializer.instance.event_id, serializer.instance.score
+        with transaction.atomic():
+            rating = serializer.save()
+            rating_service.apply_score(old_event_id, old_score, -1)
+            rating_service.apply_score(rating.event_id, rating.score, 1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            self.get_rating_service().apply_score(instance.event_id, instance.score, -1)
     
 
-class BookingViewSet(ErrorHandlingMixin, viewsets.ModelViewSet):
+class BookingViewSet(ErrorHandlingMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Бронь не редактируется: перенос на другое событие обошёл бы счётчик мест.
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+
+    def get_booking_service(self):
+        return BookingService()
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        return Booking.objects.filter(user=self.request.user).select_related('user')
+
+    def create(self, request, *args, **kwargs):
+        """Создает бронь, возвращая ошибку из perform_create, если она есть."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        error = self.perform_create(serializer)
+        if error:
+            return error
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
         event = serializer.validated_data['event']
+        booking_service = self.get_booking_service()
 
-        if Booking.objects.filter(user=self.request.user, event=event).exists():
+        if not event.can_book():
             return self.create_error_response(
-                "Вы уже забронировали место на это мероприятие.",
+                "Бронирование невозможно, так как до события осталось менее 30 минут.",
                 status.HTTP_400_BAD_REQUEST
             )
 
+        # Повторную бронь ловит уникальный индекс, а место занимает
+        # условный UPDATE счётчика: без предварительных COUNT и гонок.
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    booking = serializer.save(user=self.request.user)
+            except IntegrityError:
+                return self.create_error_response(
+                    "Вы уже забронировали место на это мероприятие.",
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            # Своё удержание, даже просроченное, но ещё не снятое, уже занимает
+            # место в счётчике: бронь забирает его вместо второго места.
+            held, _ = SeatHold.objects.filter(user=self.request.user, event=event).delete()
+            if not held and not booking_service.reserve_seat(event.id):
+                transaction.set_rollback(True)
+                return self.create_error_response(
+                    "Нет доступных мест.",
+                    status.HTTP_400_BAD_REQUEST
+                )
+            EventStatsService().record_bookings({event.id: 1})
+
+            # Уведомление фиксируется вместе с бронью; доставит relay outbox.
+            NotificationOutbox.objects.enqueue(
+                [booking.user.id],
+                booking.event.id,
+                f"Вы забронировали мероприятие: {booking.event.title}"
+            )
+
+    def perform_destroy(self, instance):
+        """Удаляет бронь; место переходит первому в листе ожидания, если он есть."""
+        booking_service = self.get_booking_service()
+        with transaction.atomic():
+            instance.delete()
+            EventStatsService().record_cancellation(instance.event_id)
+            promoted = booking_service.promote_from_waitlist(instance.event_id)
+            if promoted is None:
+                booking_service.release_seat(instance.event_id)
+            else:
+                notify_promoted([promoted])
+
+    @action(detail=False, methods=['post'])
+    def hold(self, request):
+        """Удерживает место на время оформления и возвращает токен подтверждения."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data['event']
+        booking_service = self.get_booking_service()
+
         if not event.can_book():
             return self.create_error_response(
                 "Бронирование невозможно, так как до события осталось менее 30 минут.",
                 status.HTTP_400_BAD_REQUEST
             )
+        if Booking.objects.filter(user=request.user, event=event).exists():
+            return self.create_error_response(
+                "Вы уже забронировали место на это мероприятие.",
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            # Своё просроченное, но ещё не снятое удержание не мешает новому.
+            expired, _ = SeatHold.objects.filter(
+                user=request.user, event=event, expires_at__lte=timezone.now()
+            ).delete()
+            if expired:
+                notify_promoted(booking_service.release_holds({event.id: expired}))
+            try:
+                hold = booking_service.hold_seat(request.user, event)
+            except IntegrityError:
+                return self.create_error_response(
+                    "Вы уже удерживаете место на это мероприятие.",
+                    status.HTTP_400_BAD_REQUEST
+                )
+            if hold is None:
+                transaction.set_rollback(True)
+                return self.create_error_response(
+                    "Нет доступных мест.",
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response(SeatHoldSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def confirm(self, request):
+        """Превращает удержание по токену в бронь; место уже занято удержанием."""
+        serializer = SeatHoldConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking_service = self.get_booking_service()
 
-        booked_seats = Booking.objects.filter(event=event).count()
-        if booked_seats >= event.seats:
+        with transaction.atomic():
+            hold = (
+                SeatHold.objects.select_for_update(of=('self',))
+                .select_related('event')
+                .filter(token=serializer.validated_data['token'], user=request.user)
+                .first()
+            )
+            if hold is None:
+                return self.create_error_response(
+                    "Удержание не найдено или уже снято.",
+                    status.HTTP_404_NOT_FOUND
+                )
+            hold.delete()
+            error = None
+            if hold.is_expired():
+                error = "Время удержания истекло."
+            elif not hold.event.can_book():
+                error = "Бронирование невозможно, так как до события осталось менее 30 минут."
+            else:
+                try:
+                    with transaction.atomic():
+                        booking = Booking.objects.create(user=request.user, event=hold.event)
+                except IntegrityError:
+                    error = "Вы уже забронировали место на это мероприятие."
+            if error:
+                notify_promoted(booking_service.release_holds({hold.event_id: 1}))
+            else:
+                EventStatsService().record_bookings({hold.event_id: 1})
+                NotificationOutbox.objects.enqueue(
+                    [booking.user_id],
+                    booking.event_id,
+                    f"Вы забронировали мероприятие: {hold.event.title}"
+                )
+
+        if error:
+            return self.create_error_response(error, status.HTTP_400_BAD_REQUEST)
+        return Response(BookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Групповая бронь одной транзакцией: всё или ничего."""
+        serializer = BookingBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        event_ids = list(dict.fromkeys(data['events'] if 'events' in data else [data['event']]))
+
+        events = Event.objects.in_bulk(event_ids)
+        if len(events) != len(event_ids):
+            return self.create_error_response("Мероприятие не найдено.", status.HTTP_404_NOT_FOUND)
+        if not all(event.can_book() for event in events.values()):
             return self.create_error_response(
-                "Нет доступных мест.",
+                "Бронирование невозможно, так как до события осталось менее 30 минут.",
                 status.HTTP_400_BAD_REQUEST
             )
 
-        booking = serializer.save(user=self.request.user)
+        users = {request.user.id: request.user}
+        if 'users' in data:
+            event = events[event_ids[0]]
+            if event.organizer_id != request.user.id and not request.user.is_staff:
+                return self.create_error_response(
+                    "Бронировать места для других пользователей может только организатор.",
+                    status.HTTP_403_FORBIDDEN
+                )
+            user_ids = list(dict.fromkeys(data['users']))
+            users = User.objects.in_bulk(user_ids)
+            if len(users) != len(user_ids):
+                return self.create_error_response(
+                    "Пользователь не найден.",
+                    status.HTTP_400_BAD_REQUEST
+                )
 
-        # Уведомление после создания брони
-        notify_user.delay(
-            booking.user.id,
-            booking.event.id,
-            f"Вы забронировали мероприятие: {booking.event.title}"
-        )
+        # Одна вставка всех броней и один условный UPDATE счётчиков:
+        # если места есть не на всё, откатывается вся группа.
+        bookings = [
+            Booking(user=user, event=events[event_id])
+            for event_id in event_ids
+            for user in users.values()
+        ]
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    Booking.objects.bulk_create(bookings)
+            except IntegrityError:
+                return self.create_error_response(
+                    "Часть мест уже забронирована этими пользователями.",
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            # Места собственных удержаний уже заняты: занимаем только недостающие.
+            booking_service = self.get_booking_service()
+            held = booking_service.consume_holds(users, event_ids)
+            needed = {}
+            for event_id in event_ids:
+                needed.setdefault(len(users) - held[event_id], []).append(event_id)
+            if not all(
+                booking_service.reserve_seats(ids, count)
+                for count, ids in needed.items() if count
+            ):
+                transaction.set_rollback(True)
+                return self.create_error_response(
+                    "Нет доступных мест.",
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            EventStatsService().record_bookings({event_id: len(users) for event_id in event_ids})
+            for event in events.values():
+                NotificationOutbox.objects.enqueue(
+                    list(users),
+                    event.id,
+                    f"Вы забронировали мероприятие: {event.title}"
+                )
+        return Response(BookingSerializer(bookings, many=True).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['delete'], permission_classes=[permissions.IsAuthenticated])
     def cancel_booking(self, request, pk=None):
@@ -141,22 +475,112 @@ class BookingViewSet(ErrorHandlingMixin, viewsets.ModelViewSet):
                 status.HTTP_403_FORBIDDEN
             )
 
-        # Уведомление перед удалением брони
+        # Уведомление фиксируется в одной транзакции с удалением брони
         print(f"Booking {booking.id} deleted, notifying user {booking.user.id}")
-        notify_user.delay(
-            booking.user.id,
-            booking.event.id,
-            f"Вы отменили бронирование для мероприятия: {booking.event.title}"
+        with transaction.atomic():
+            NotificationOutbox.objects.enqueue(
+                [booking.user.id],
+                booking.event.id,
+                f"Вы отменили бронирование для мероприятия: {booking.event.title}"
+            )
+            self.perform_destroy(booking)
+        return Response({"detail": "Бронирование успешно отменено."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class WaitlistViewSet(
+    ErrorHandlingMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    """Лист ожидания: вместо повторных попыток брони — одна запись в очереди."""
+    serializer_class = WaitlistSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Записи пользователя с текущей позицией в очереди события."""
+        ahead = (
+            Waitlist.objects.filter(event=OuterRef('event'), id__lte=OuterRef('id'))
+            .order_by()
+            .values('event')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return (
+            Waitlist.objects.filter(user=self.request.user)
+            .select_related('user')
+            .annotate(position=Subquery(ahead))
+            .order_by('id')
         )
 
-        booking.delete()
-        return Response({"detail": "Бронирование успешно отменено."}, status=status.HTTP_204_NO_CONTENT)
+    def create(self, request, *args, **kwargs):
+        """Ставит пользователя в очередь на заполненное событие."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data['event']
+
+        if not event.can_book():
+            return self.create_error_response(
+                "Бронирование невозможно, так как до события осталось менее 30 минут.",
+                status.HTTP_400_BAD_REQUEST
+            )
+        if event.booked_count < event.seats:
+            return self.create_error_response(
+                "Есть свободные места, забронируйте напрямую.",
+                status.HTTP_400_BAD_REQUEST
+            )
+        if Booking.objects.filter(user=request.user, event=event).exists():
+            return self.create_error_response(
+                "Вы уже забронировали место на это мероприятие.",
+                status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            with transaction.atomic():
+                entry = serializer.save(user=request.user)
+        except IntegrityError:
+            return self.create_error_response(
+                "Вы уже в листе ожидания этого мероприятия.",
+                status.HTTP_400_BAD_REQUEST
+            )
 
+        entry.position = Waitlist.objects.filter(event=event, id__lte=entry.id).count()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class NotificationViewSet(viewsets.ModelViewSet):
+
+class NotificationViewSet(ErrorHandlingMixin, ValuesListMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    http_method_names = ['get']
+    pagination_class = NotificationPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
\ No newline at end of file
+        """Уведомления пользователя; с ?since_id= — только более новые."""
+        queryset = Notification.objects.filter(user=self.request.user).select_related('user')
+        since_id = self.request.query_params.get('since_id')
+        if since_id is not None:
+            if not since_id.isdigit():
+                raise serializers.ValidationError({'since_id': 'Ожидается целое число.'})
+            queryset = queryset.filter(id__gt=int(since_id))
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Возвращает число непрочитанных уведомлений из кеша."""
+        return Response({"unread": get_unread_count(request.user.id)})
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """Отмечает прочитанными все уведомления до up_to_id одним UPDATE."""
+        up_to_id = str(request.data.get('up_to_id', ''))
+        if not up_to_id.isdigit():
+            return self.create_error_response(
+                "Укажите up_to_id — id последнего прочитанного уведомления.",
+                status.HTTP_400_BAD_REQUEST
+            )
+        marked = Notification.objects.filter(
+            user=request.user,
+            id__lte=int(up_to_id),
+            read_at__isnull=True
+        ).update(read_at=timezone.now())
+        invalidate_unread_counts([request.user.id])
+        return Response({"marked": marked}, status=status.HTTP_200_OK)
@@ -13,4 +13,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'events_app.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from events.streams import STREAM_PATH, notification_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """Отдаёт поток уведомлений напрямую, остальное — через Django."""
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+        return await notification_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
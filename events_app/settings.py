@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'events',
@@ -95,19 +96,129 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Общий кеш процессов — Redis, если задан CACHE_REDIS_URL; иначе локальная память.
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Время жизни закешированных ответов списка и карточки событий, в секундах.
+EVENTS_CACHE_TIMEOUT = int(os.getenv('EVENTS_CACHE_TIMEOUT', '60'))
+
+# Списки событий, броней и уведомлений строятся из .values() без объектов
+# моделей; вывод тот же, флаг — чтобы вернуться к обычным сериализаторам.
+FAST_LIST_SERIALIZATION = os.getenv('FAST_LIST_SERIALIZATION', 'True') == 'True'
+# JSON через orjson (если установлен). Он быстрее, но числа с плавающей точкой
+# меньше 1e-4 и от 1e16 пишет без экспоненты (0.00001 вместо 1e-05).
+FAST_JSON_RENDERER = os.getenv('FAST_JSON_RENDERER', 'False') == 'True'
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'events.renderers.FastJSONRenderer' if FAST_JSON_RENDERER
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
-CELERY_BROKER_URL = 'redis://redis:6379/0'
-CELERY_RESULT_BACKEND = 'redis://redis:6379/0'
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
-CELERY_TASK_ALWAYS_EAGER = True
+# Задачи уходят в брокер; синхронное выполнение — только для отладки.
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+# Результаты задач никто не читает — не пишем их в Redis.
+CELERY_TASK_IGNORE_RESULT = True
+
+# Уведомления и обслуживание — в разных очередях и воркерах, чтобы
+# долгие пачки обслуживания не задерживали доставку уведомлений.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'events.tasks.notify_user': {'queue': 'notifications'},
+    'events.tasks.notify_users': {'queue': 'notifications'},
+    'events.tasks.relay_notification_outbox': {'queue': 'notifications'},
+    'events.tasks.deliver_outbox': {'queue': 'notifications'},
+    'events.tasks.complete_old_events': {'queue': 'maintenance'},
+    'events.tasks.release_expired_holds': {'queue': 'maintenance'},
+}
+# Подтверждение после выполнения: задача упавшего воркера вернётся в очередь.
+# Задачи обслуживания и доставки outbox повтор переносят (пачки в транзакциях
+# с select_for_update, доставленные записи outbox удаляются); notify_user
+# и notify_users не идемпотентны и подтверждаются при получении.
+# Предвыборка минимальна (воркер уведомлений поднимает её параметром
+# --prefetch-multiplier).
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv('CELERY_WORKER_PREFETCH_MULTIPLIER', '1'))
+# Неподтверждённая задача выдаётся повторно через столько секунд; должно
+# быть больше самой долгой задачи.
+CELERY_BROKER_TRANSPORT_OPTIONS = {'visibility_timeout': 3600}
+CELERY_TASK_TIME_LIMIT = int(os.getenv('CELERY_TASK_TIME_LIMIT', '900'))
+
+EVENTS_COMPLETE_BATCH_SIZE = int(os.getenv('EVENTS_COMPLETE_BATCH_SIZE', '1000'))
+# Строк NDJSON на одну пачку проверки и bulk_create при импорте и экспорте.
+EVENTS_BULK_BATCH_SIZE = int(os.getenv('EVENTS_BULK_BATCH_SIZE', '1000'))
+# Радиус поиска ?near= по умолчанию и наибольший допустимый, км.
+EVENTS_NEAR_DEFAULT_RADIUS_KM = float(os.getenv('EVENTS_NEAR_DEFAULT_RADIUS_KM', '10'))
+EVENTS_NEAR_MAX_RADIUS_KM = float(os.getenv('EVENTS_NEAR_MAX_RADIUS_KM', '500'))
+# Календарь: наибольшее число корзин (дней или недель) в ответе
+# и сколько событий показывать в корзине.
+EVENTS_CALENDAR_MAX_BUCKETS = int(os.getenv('EVENTS_CALENDAR_MAX_BUCKETS', '100'))
+EVENTS_CALENDAR_BUCKET_SIZE = int(os.getenv('EVENTS_CALENDAR_BUCKET_SIZE', '20'))
+# Предел мест в одной групповой брони.
+BOOKING_BATCH_MAX_SIZE = int(os.getenv('BOOKING_BATCH_MAX_SIZE', '100'))
+# Сколько минут держится место до подтверждения брони и как часто
+# beat снимает просроченные удержания.
+SEAT_HOLD_TTL_MINUTES = int(os.getenv('SEAT_HOLD_TTL_MINUTES', '10'))
+SEAT_HOLD_SWEEP_INTERVAL = int(os.getenv('SEAT_HOLD_SWEEP_INTERVAL', '60'))
+SEAT_HOLD_SWEEP_BATCH_SIZE = int(os.getenv('SEAT_HOLD_SWEEP_BATCH_SIZE', '1000'))
+
+EVENTS_COMPLETE_INTERVAL = int(os.getenv('EVENTS_COMPLETE_INTERVAL', '600'))
+
+# Outbox уведомлений: как часто relay публикует новые записи и через
+# сколько секунд повторно публикует опубликованные, но не доставленные.
+NOTIFICATION_OUTBOX_RELAY_INTERVAL = float(os.getenv('NOTIFICATION_OUTBOX_RELAY_INTERVAL', '2'))
+NOTIFICATION_OUTBOX_REDELIVERY_TIMEOUT = int(os.getenv('NOTIFICATION_OUTBOX_REDELIVERY_TIMEOUT', '300'))
+
+CELERY_BEAT_SCHEDULE = {
+    'relay-notification-outbox': {
+        'task': 'events.tasks.relay_notification_outbox',
+        'schedule': NOTIFICATION_OUTBOX_RELAY_INTERVAL,
+        'options': {'expires': NOTIFICATION_OUTBOX_RELAY_INTERVAL},
+    },
+    'complete-old-events': {
+        'task': 'events.tasks.complete_old_events',
+        'schedule': EVENTS_COMPLETE_INTERVAL,
+        # Пропущенный запуск не копится: следующий сделает ту же работу.
+        'options': {'expires': EVENTS_COMPLETE_INTERVAL},
+    },
+    'release-expired-holds': {
+        'task': 'events.tasks.release_expired_holds',
+        'schedule': SEAT_HOLD_SWEEP_INTERVAL,
+        'options': {'expires': SEAT_HOLD_SWEEP_INTERVAL},
+    },
+}
+
+# Размер пачки INSERT при массовом создании уведомлений.
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '500'))
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = 300
+
+# Поток уведомлений (SSE) в ASGI-приложении. Без Redis pub/sub работает
+# внутри процесса; Redis нужен, когда уведомления создаёт воркер Celery.
+NOTIFICATION_STREAM_REDIS_URL = os.getenv('NOTIFICATION_STREAM_REDIS_URL', '')
+NOTIFICATION_STREAM_HEARTBEAT = 15
+NOTIFICATION_STREAM_QUEUE_SIZE = 100
+# Пауза перед переподключением к Redis pub/sub, секунды: удваивается до предела.
+NOTIFICATION_STREAM_RECONNECT_DELAY = 0.5
+NOTIFICATION_STREAM_RECONNECT_MAX_DELAY = 30
 
 LOGGING = {
     'version': 1,
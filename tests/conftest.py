@@ -0,0 +1,14 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш в памяти переживает откат транзакции теста, поэтому чистим его."""
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_celery(settings):
+    """В тестах нет брокера: задачи выполняются синхронно в процессе."""
+    settings.CELERY_TASK_ALWAYS_EAGER = True
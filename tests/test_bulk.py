@@ -0,0 +1,161 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event, Tag
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def tags():
+    return [Tag.objects.create(name='concert'), Tag.objects.create(name='exhibition')]
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.login(username='testuser', password='testpassword')
+    return client
+
+
+def event_line(number, **extra):
+    data = {
+        'title': f'Imported {number}',
+        'description': 'Imported description',
+        'start_time': (timezone.now() + timedelta(days=1, hours=number)).isoformat(),
+        'location': 'Test City',
+        'seats': 10 + number,
+        'status': 'planned',
+    }
+    data.update(extra)
+    return json.dumps(data)
+
+
+def ndjson(lines):
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def post_import(client, body):
+    return client.post('/api/events/import/', body, content_type='application/x-ndjson')
+
+
+@pytest.mark.django_db
+def test_import_creates_events_with_tags(client, user, tags):
+    lines = [event_line(n, tag_ids=[tags[n % 2].id]) for n in range(10)]
+    lines.insert(3, '')
+    response = post_import(client, ndjson(lines))
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data == {'created': 10}
+    assert Event.objects.filter(organizer=user).count() == 10
+    event = Event.objects.get(title='Imported 3')
+    assert list(event.tags.all()) == [tags[1]]
+    assert event.tag_ids == [tags[1].id]
+
+
+@pytest.mark.django_db
+def test_import_query_count_does_not_grow_with_rows(client, tags, django_assert_max_num_queries, settings):
+    settings.EVENTS_BULK_BATCH_SIZE = 1000
+    lines = [event_line(n, tag_ids=[tag.id for tag in tags]) for n in range(200)]
+    # Сессия и пользователь, savepoint, две проверки ссылок, два INSERT.
+    with django_assert_max_num_queries(10):
+        response = post_import(client, ndjson(lines))
+    assert response.data == {'created': 200}
+    assert Event.tags.through.objects.count() == 400
+
+
+@pytest.mark.django_db
+def test_import_is_all_or_nothing(client, tags):
+    lines = [
+        event_line(1),
+        '{not json',
+        event_line(3, seats=-1),
+        event_line(4, tag_ids=[tags[0].id, 9999]),
+        event_line(5, organizer_id=9999),
+    ]
+    response = post_import(client, ndjson(lines))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert [error['line'] for error in response.data['errors']] == [2, 3, 4, 5]
+    assert 'tag_ids' in response.data['errors'][2]['errors']
+    assert 'organizer_id' in response.data['errors'][3]['errors']
+    assert not Event.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_stops_writing_after_error_in_earlier_batch(client, settings):
+    settings.EVENTS_BULK_BATCH_SIZE = 2
+    lines = [event_line(1), event_line(2, seats='many'), event_line(3), event_line(4)]
+    response = post_import(client, ndjson(lines))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Event.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_requires_authentication(tags):
+    response = post_import(APIClient(), ndjson([event_line(1)]))
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+@pytest.mark.django_db
+def test_export_streams_catalog_as_ndjson(client, user, tags):
+    post_import(client, ndjson([event_line(n, tag_ids=[tags[0].id]) for n in range(3)]))
+    Event.objects.create(
+        title='Other City', description='d', start_time=timezone.now() + timedelta(days=2),
+        location='Other City', seats=5, organizer=user
+    )
+
+    response = client.get('/api/events/export/?location=Test+City')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    assert [row['title'] for row in rows] == ['Imported 0', 'Imported 1', 'Imported 2']
+    assert rows[0]['tag_ids'] == [tags[0].id]
+    assert rows[0]['organizer_id'] == user.id
+
+
+@pytest.mark.django_db
+def test_export_and_import_commands_round_trip(user, tags, tmp_path):
+    for n in range(3):
+        event = Event.objects.create(
+            title=f'Event {n}', description='d', start_time=timezone.now() + timedelta(days=n + 1),
+            location='Test City', seats=5, organizer=user
+        )
+        event.tags.set(tags[:n])
+    path = tmp_path / 'events.ndjson'
+
+    call_command('export_events', output=str(path))
+    Event.objects.all().delete()
+    out = StringIO()
+    call_command('import_events', str(path), organizer='testuser', stdout=out)
+
+    assert 'Импортировано событий: 3' in out.getvalue()
+    imported = {event.title: event.tag_ids for event in Event.objects.all()}
+    assert imported == {
+        'Event 0': [],
+        'Event 1': [tags[0].id],
+        'Event 2': sorted(tag.id for tag in tags),
+    }
+
+
+@pytest.mark.django_db
+def test_import_command_reports_errors(user, tmp_path):
+    path = tmp_path / 'events.ndjson'
+    path.write_bytes(ndjson([event_line(1), '[]']))
+    err = StringIO()
+    with pytest.raises(CommandError):
+        call_command('import_events', str(path), organizer='testuser', stderr=err)
+    assert 'Строка 2' in err.getvalue()
+    assert not Event.objects.exists()
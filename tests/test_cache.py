@@ -0,0 +1,119 @@
+from datetime import timedelta
+import contextlib
+import io
+
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from events.models import Event
+from events.tasks import complete_old_events
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def event(user):
+    return Event.objects.create(
+        title='Test Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=100,
+        status='planned',
+        organizer=user
+    )
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def ids(response):
+    return [item['id'] for item in response.data['results']]
+
+
+@pytest.mark.django_db
+def test_list_and_detail_served_from_cache(client, event, django_assert_num_queries):
+    first = client.get('/api/events/')
+    detail = client.get(f'/api/events/{event.id}/')
+
+    with django_assert_num_queries(0):
+        assert client.get('/api/events/').data == first.data
+        assert client.get(f'/api/events/{event.id}/').data == detail.data
+
+
+@pytest.mark.django_db
+def test_query_params_are_normalized(client, event, django_assert_num_queries):
+    client.get('/api/events/?status=planned&location=Test+City')
+    with django_assert_num_queries(0):
+        client.get('/api/events/?location=Test+City&status=planned')
+
+
+@pytest.mark.django_db
+def test_etag_returns_not_modified(client, event):
+    response = client.get('/api/events/')
+    etag = response['ETag']
+
+    response = client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+
+    response = client.get('/api/events/', HTTP_IF_NONE_MATCH='"stale"')
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_event_create_invalidates_list(client, user, event, django_capture_on_commit_callbacks):
+    etag = client.get('/api/events/')['ETag']
+    client.force_authenticate(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post('/api/events/', {
+            'title': 'New Event',
+            'description': 'Event description',
+            'start_time': (timezone.now() + timedelta(days=2)).isoformat(),
+            'location': 'Test City',
+            'seats': 50,
+            'organizer_id': user.id,
+        }, format='json')
+
+    listing = client.get('/api/events/', HTTP_IF_NONE_MATCH=etag)
+    assert listing.status_code == status.HTTP_200_OK
+    assert ids(listing) == [event.id, response.data['id']]
+
+
+@pytest.mark.django_db
+def test_update_status_invalidates_detail(client, user, event, django_capture_on_commit_callbacks):
+    client.get(f'/api/events/{event.id}/')
+    client.force_authenticate(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(f'/api/events/{event.id}/update_status/', {'status': 'canceled'}, format='json')
+    assert client.get(f'/api/events/{event.id}/').data['status'] == 'canceled'
+
+
+@pytest.mark.django_db
+def test_booking_invalidates_availability(client, user, event, django_capture_on_commit_callbacks):
+    event.seats = 1
+    event.save()
+    assert ids(client.get('/api/events/?available=true')) == [event.id]
+
+    client.force_authenticate(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post('/api/bookings/', {'event': event.id}, format='json')
+    assert ids(client.get('/api/events/?available=true')) == []
+
+
+@pytest.mark.django_db
+def test_complete_old_events_invalidates(client, event, django_capture_on_commit_callbacks):
+    Event.objects.filter(pk=event.pk).update(start_time=timezone.now() - timedelta(hours=3))
+    client.get(f'/api/events/{event.id}/')
+    with django_capture_on_commit_callbacks(execute=True), \
+            contextlib.redirect_stdout(io.StringIO()):
+        complete_old_events()
+    assert client.get(f'/api/events/{event.id}/').data['status'] == 'completed'
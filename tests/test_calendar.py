@@ -0,0 +1,115 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event
+from events.services import EventCalendarService
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def at(day, hour):
+    return datetime.combine(day, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=hour)
+
+
+def make_events(user, starts):
+    return Event.objects.bulk_create(
+        Event(
+            title=f'Event {n}',
+            description='Long description ' * 50,
+            start_time=start,
+            location='Test City',
+            seats=10,
+            status='planned',
+            organizer=user
+        )
+        for n, start in enumerate(starts)
+    )
+
+
+@pytest.mark.django_db
+def test_calendar_counts_and_summaries_per_day(client, user):
+    events = make_events(user, [at(date(2026, 11, 2), 10), at(date(2026, 11, 2), 9), at(date(2026, 11, 4), 12)])
+
+    response = client.get('/api/events/calendar/', {'from': '2026-11-01', 'to': '2026-11-04'})
+    assert response.status_code == status.HTTP_200_OK
+    buckets = response.data['buckets']
+    assert [(bucket['start'], bucket['count']) for bucket in buckets] == [
+        (date(2026, 11, 1), 0), (date(2026, 11, 2), 2), (date(2026, 11, 3), 0), (date(2026, 11, 4), 1)
+    ]
+    assert [event['id'] for event in buckets[1]['events']] == [events[1].id, events[0].id]
+    assert set(buckets[1]['events'][0]) == {'id', 'title', 'start_time', 'status'}
+
+
+@pytest.mark.django_db
+def test_calendar_weeks_start_on_monday_and_cap_summaries(client, user, settings):
+    settings.EVENTS_CALENDAR_BUCKET_SIZE = 2
+    # 2026-11-04 — среда, неделя начинается 2026-11-02.
+    make_events(user, [at(date(2026, 11, 2), hour) for hour in range(5)] + [at(date(2026, 11, 9), 0)])
+
+    response = client.get(
+        '/api/events/calendar/', {'from': '2026-11-04', 'to': '2026-11-10', 'granularity': 'week'}
+    )
+    buckets = response.data['buckets']
+    assert [(bucket['start'], bucket['count'], len(bucket['events'])) for bucket in buckets] == [
+        (date(2026, 11, 2), 5, 2), (date(2026, 11, 9), 1, 1)
+    ]
+
+
+@pytest.mark.django_db
+def test_calendar_buckets_are_cached_until_events_change(
+    client, user, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    make_events(user, [at(date(2026, 11, 2), 10)])
+    params = {'from': '2026-11-01', 'to': '2026-11-03'}
+    client.get('/api/events/calendar/', params)
+    with django_assert_num_queries(0):
+        client.get('/api/events/calendar/', params)
+    # Запрос с частично закешированным диапазоном дочитывает только недостающее.
+    with django_assert_num_queries(1) as queries:
+        client.get('/api/events/calendar/', {'from': '2026-11-02', 'to': '2026-11-05'})
+    assert '2026-11-04' in queries.captured_queries[0]['sql']
+    assert '2026-11-02' not in queries.captured_queries[0]['sql']
+
+    client.force_authenticate(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(f'/api/events/{Event.objects.get().id}/update_status/', {'status': 'canceled'})
+    response = client.get('/api/events/calendar/', params)
+    assert response.data['buckets'][1]['events'][0]['status'] == 'canceled'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {'from': '2026-11-05', 'to': '2026-11-01'},
+    {'from': '2026-01-01', 'to': '2026-12-31'},
+    {'from': '2026-11-01', 'to': '2026-11-02', 'granularity': 'month'},
+    {'to': '2026-11-02'},
+])
+def test_calendar_rejects_invalid_ranges(client, params):
+    assert client.get('/api/events/calendar/', params).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_calendar_reads_only_the_covering_index(user):
+    make_events(user, [at(date(2026, 11, 2), 10)])
+    queryset = EventCalendarService('day').rows(date(2026, 11, 1), date(2026, 11, 3))
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_bitmapscan = off')
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN {sql}', params)
+        plan = '\n'.join(row[0] for row in cursor.fetchall())
+    assert 'Index Only Scan using event_calendar_idx' in plan
+    assert 'JOIN' not in sql
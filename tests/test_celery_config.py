@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.db import OperationalError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event, Notification, NotificationOutbox
+from events.tasks import notify_user, notify_users
+from events_app.celery import app
+
+
+@pytest.mark.parametrize('task, queue', [
+    ('events.tasks.notify_user', 'notifications'),
+    ('events.tasks.notify_users', 'notifications'),
+    ('events.tasks.relay_notification_outbox', 'notifications'),
+    ('events.tasks.deliver_outbox', 'notifications'),
+    ('events.tasks.complete_old_events', 'maintenance'),
+    ('events.tasks.release_expired_holds', 'maintenance'),
+])
+def test_tasks_are_routed_to_separate_queues(task, queue):
+    assert app.amqp.router.route({}, task)['queue'].name == queue
+
+
+def test_beat_runs_maintenance_tasks():
+    scheduled = {entry['task'] for entry in django_settings.CELERY_BEAT_SCHEDULE.values()}
+    assert scheduled == {
+        'events.tasks.complete_old_events',
+        'events.tasks.release_expired_holds',
+        'events.tasks.relay_notification_outbox',
+    }
+    assert app.conf.task_acks_late
+    assert app.conf.worker_prefetch_multiplier == 1
+    # Повторная выдача после коммита задвоила бы уведомления.
+    assert not notify_user.acks_late and not notify_users.acks_late
+
+
+@pytest.mark.django_db
+def test_booking_does_not_touch_broker(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    user = User.objects.create_user(username='testuser', password='testpassword')
+    event = Event.objects.create(
+        title='Async Event', description='d', start_time=timezone.now() + timedelta(days=1),
+        location='Test City', seats=5, status='planned', organizer=user
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+
+    with patch('celery.app.task.Task.apply_async') as apply_async:
+        response = client.post('/api/bookings/', {'event': event.id}, format='json')
+
+    assert response.status_code == status.HTTP_201_CREATED
+    apply_async.assert_not_called()
+    assert NotificationOutbox.objects.count() == 1
+    assert not Notification.objects.exists()
+
+
+@pytest.mark.django_db
+def test_notification_task_retries_database_errors():
+    user = User.objects.create_user(username='testuser', password='testpassword')
+    event = Event.objects.create(
+        title='Retry Event', description='d', start_time=timezone.now() + timedelta(days=1),
+        location='Test City', seats=5, status='planned', organizer=user
+    )
+    with patch('events.tasks.create_notifications', side_effect=[OperationalError('gone'), [object()]]) as create:
+        result = notify_users.delay([user.id], event.id, 'Повтор')
+    assert result.get() == 1
+    assert create.call_count == 2
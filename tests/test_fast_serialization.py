@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from events.models import Booking, Event, Notification, Tag
+from events.renderers import FastJSONRenderer, orjson
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def events(user):
+    rock, jazz = Tag.objects.create(name='рок'), Tag.objects.create(name='джаз')
+    now = timezone.now()
+    events = [
+        Event.objects.create(
+            title=f'Концерт {number}',
+            description='Живая музыка\u2028и танцы',
+            start_time=now + timedelta(days=number, microseconds=123456),
+            location='Москва',
+            seats=100,
+            status='planned',
+            organizer=user,
+            latitude=55.75 + number / 100 if number % 2 else None,
+            longitude=37.62 if number % 2 else None
+        )
+        for number in range(1, 6)
+    ]
+    events[0].tags.add(jazz, rock)
+    events[1].tags.add(rock)
+    return events
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def both_paths(client, settings, url, params=None):
+    """Тела ответов обычных сериализаторов и быстрого пути."""
+    content = {}
+    # Курсор ленты хранит момент запроса: фиксируем его, чтобы ссылки совпали.
+    now = timezone.now()
+    for fast in (False, True):
+        settings.FAST_LIST_SERIALIZATION = fast
+        cache.clear()
+        with patch('django.utils.timezone.now', return_value=now):
+            response = client.get(url, params)
+        assert response.status_code == 200
+        content[fast] = response.content
+    return content[False], content[True]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {},
+    {'page_size': 2},
+    {'compact': 'true'},
+    {'fields': 'id,tags,latitude'},
+    {'omit': 'description,organizer'},
+    {'q': 'концерт', 'page_size': 2},
+    {'near': '55.76,37.62', 'radius_km': 50},
+])
+def test_event_list_matches_serializer(client, settings, events, params):
+    slow, fast = both_paths(client, settings, '/api/events/', params)
+    assert fast == slow
+
+
+@pytest.mark.django_db
+def test_event_list_next_page_matches_serializer(client, settings, events):
+    settings.FAST_LIST_SERIALIZATION = True
+    next_url = client.get('/api/events/', {'page_size': 2}).data['next']
+    slow, fast = both_paths(client, settings, next_url)
+    assert fast == slow
+
+
+@pytest.mark.django_db
+def test_booking_and_notification_lists_match_serializer(client, settings, user, events):
+    Booking.objects.create(user=user, event=events[0])
+    Notification.objects.create(user=user, event=events[0], message='Бронь подтверждена')
+    Notification.objects.create(user=user, event=None, message='Добро пожаловать', read_at=timezone.now())
+
+    assert len(set(both_paths(client, settings, '/api/bookings/'))) == 1
+    assert len(set(both_paths(client, settings, '/api/notifications/', {'page_size': 1}))) == 1
+    settings.FAST_LIST_SERIALIZATION = True
+    next_url = client.get('/api/notifications/', {'page_size': 1}).data['next']
+    assert client.get(next_url).data['results'][0]['message'] == 'Бронь подтверждена'
+
+
+@pytest.mark.django_db
+def test_fast_path_skips_model_instances(client, settings, events, django_assert_num_queries):
+    settings.FAST_LIST_SERIALIZATION = True
+    # Три группы ленты и теги страницы, как и с prefetch_related.
+    with django_assert_num_queries(4):
+        response = client.get('/api/events/')
+    assert response.data['results'][0]['tags'] == [
+        {'id': tag.id, 'name': tag.name} for tag in events[0].tags.order_by('id')
+    ]
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson не установлен')
+@pytest.mark.django_db
+def test_fast_renderer_matches_json_renderer(client, settings, events):
+    settings.FAST_LIST_SERIALIZATION = True
+    data = client.get('/api/events/', {'near': '55.76,37.62', 'radius_km': 50}).data
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert FastJSONRenderer().render(None) == b''
+    assert b'\\u2028' in FastJSONRenderer().render(data)
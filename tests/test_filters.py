@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from django.db.models import Avg, Count, F
 from datetime import timedelta
+from rest_framework.test import APIClient
 
 
 @pytest.fixture
@@ -95,4 +96,72 @@ def test_event_filter_by_booked_seats(booked_event):
 def test_event_filter_by_rating(rated_event, user):
     events = Event.objects.annotate(avg_rating=Avg('ratings__score')).filter(avg_rating__gte=3)
     assert len(events) > 0
-    assert rated_event in events
\ No newline at end of file
+    assert rated_event in events
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_rating_updates_stored_aggregates(client, user):
+    event = Event.objects.create(
+        title='Completed Event',
+        description='Completed description',
+        start_time=timezone.now() - timedelta(days=1),
+        location='Test City',
+        seats=50,
+        status='completed',
+        organizer=user
+    )
+    Booking.objects.create(user=user, event=event)
+    client.login(username='testuser', password='testpassword')
+    response = client.post('/api/ratings/', {'event': event.id, 'score': 4}, format='json')
+    assert response.status_code == 201
+
+    event.refresh_from_db()
+    assert (event.rating_sum, event.rating_count) == (4, 1)
+
+    client.patch(f"/api/ratings/{response.data['id']}/", {'score': 2}, format='json')
+    event.refresh_from_db()
+    assert (event.rating_sum, event.rating_count) == (2, 1)
+
+    client.delete(f"/api/ratings/{response.data['id']}/")
+    event.refresh_from_db()
+    assert (event.rating_sum, event.rating_count) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_api_filter_by_stored_avg_rating(client, user):
+    high = Event.objects.create(
+        title='High', description='d', start_time=timezone.now() - timedelta(days=1),
+        location='Test City', seats=10, status='completed', organizer=user,
+        rating_sum=9, rating_count=2
+    )
+    Event.objects.create(
+        title='Low', description='d', start_time=timezone.now() - timedelta(days=1),
+        location='Test City', seats=10, status='completed', organizer=user,
+        rating_sum=4, rating_count=2
+    )
+    Event.objects.create(
+        title='Unrated', description='d', start_time=timezone.now() - timedelta(days=1),
+        location='Test City', seats=10, status='completed', organizer=user
+    )
+    response = client.get('/api/events/?avg_rating=4')
+    assert [item['id'] for item in response.data['results']] == [high.id]
+
+
+@pytest.mark.django_db
+def test_api_available_filter_not_multiplied_by_ratings(client, user):
+    event = Event.objects.create(
+        title='Small', description='d', start_time=timezone.now() - timedelta(days=1),
+        location='Test City', seats=3, status='completed', organizer=user,
+        booked_count=2
+    )
+    guests = [User.objects.create_user(username=f'guest{i}') for i in range(2)]
+    for guest in guests:
+        Booking.objects.create(user=guest, event=event)
+        Rating.objects.create(user=guest, event=event, score=5)
+
+    response = client.get('/api/events/?available=true')
+    assert [item['id'] for item in response.data['results']] == [event.id]
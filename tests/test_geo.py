@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.geo import events_near
+from events.models import Event
+
+
+MOSCOW = (55.7558, 37.6173)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def make_event(user, title, latitude=None, longitude=None):
+    return Event.objects.create(
+        title=title,
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location=title,
+        latitude=latitude,
+        longitude=longitude,
+        seats=10,
+        status='planned',
+        organizer=user
+    )
+
+
+def near(client, point, **params):
+    return client.get('/api/events/', {'near': '%s,%s' % point, **params})
+
+
+@pytest.mark.django_db
+def test_near_returns_nearest_first_within_radius(client, user):
+    podolsk = make_event(user, 'Подольск', 55.4312, 37.5458)
+    kremlin = make_event(user, 'Кремль', 55.7520, 37.6175)
+    make_event(user, 'Санкт-Петербург', 59.9343, 30.3351)
+    make_event(user, 'Без координат')
+
+    response = near(client, MOSCOW, radius_km=50)
+    assert response.status_code == status.HTTP_200_OK
+    results = response.data['results']
+    assert [item['id'] for item in results] == [kremlin.id, podolsk.id]
+    assert results[0]['distance_km'] < 1
+    assert 35 < results[1]['distance_km'] < 37
+
+    default_radius = near(client, MOSCOW).data['results']
+    assert [item['id'] for item in default_radius] == [kremlin.id]
+
+
+@pytest.mark.django_db
+def test_near_across_antimeridian(client, user):
+    east = make_event(user, 'Восток', 65.0, 179.9)
+    west = make_event(user, 'Запад', 65.0, -179.9)
+    make_event(user, 'Далеко', 65.0, 170.0)
+
+    results = near(client, (65.0, 179.95), radius_km=20).data['results']
+    assert sorted(item['id'] for item in results) == [east.id, west.id]
+
+
+@pytest.mark.django_db
+def test_near_close_to_pole(client, user):
+    across_pole = make_event(user, 'За полюсом', 89.9, -90.0)
+    results = near(client, (89.9, 90.0), radius_km=30).data['results']
+    assert [item['id'] for item in results] == [across_pole.id]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {'near': 'moscow'},
+    {'near': '95,37'},
+    {'near': '55.75,37.62', 'radius_km': '-1'},
+    {'near': '55.75,37.62', 'radius_km': '100000'},
+])
+def test_near_rejects_invalid_parameters(client, params):
+    assert client.get('/api/events/', params).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_coordinates_must_come_in_pairs(client, user):
+    client.force_authenticate(user)
+    payload = {
+        'title': 'Event', 'description': 'Test description', 'location': 'Moscow',
+        'start_time': (timezone.now() + timedelta(days=1)).isoformat(), 'seats': 10, 'organizer_id': user.id,
+        'latitude': 55.75,
+    }
+    assert client.post('/api/events/', payload, format='json').status_code == status.HTTP_400_BAD_REQUEST
+    payload['longitude'] = 37.62
+    response = client.post('/api/events/', payload, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert (response.data['latitude'], response.data['longitude']) == (55.75, 37.62)
+    assert 'distance_km' not in response.data
+
+
+@pytest.mark.django_db
+def test_near_uses_coordinates_index(user):
+    make_event(user, 'Кремль', 55.7520, 37.6175)
+    queryset = events_near(Event.objects.all(), *MOSCOW, 10)
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN {sql}', params)
+        plan = '\n'.join(row[0] for row in cursor.fetchall())
+    assert 'event_coordinates_idx' in plan
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Booking, Event, NotificationOutbox
+
+
+@pytest.fixture
+def organizer():
+    return User.objects.create_user(username='organizer', password='testpassword')
+
+
+@pytest.fixture
+def guests():
+    return [User.objects.create_user(username=f'guest{i}', password='testpassword') for i in range(5)]
+
+
+@pytest.fixture
+def event(organizer):
+    return Event.objects.create(
+        title='Group Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=5,
+        status='planned',
+        organizer=organizer
+    )
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def login(client, user):
+    client.login(username=user.username, password='testpassword')
+
+
+@pytest.mark.django_db
+def test_organizer_books_seats_for_group(client, organizer, guests, event):
+    login(client, organizer)
+    response = client.post(
+        '/api/bookings/batch/',
+        {'event': event.id, 'users': [guest.id for guest in guests]},
+        format='json'
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert sorted(item['user'] for item in response.data) == sorted(guest.username for guest in guests)
+    event.refresh_from_db()
+    assert event.booked_count == 5
+    assert Booking.objects.filter(event=event).count() == 5
+    assert sorted(NotificationOutbox.objects.values_list('user', flat=True)) == sorted(guest.id for guest in guests)
+
+
+@pytest.mark.django_db
+def test_group_booking_is_all_or_nothing_on_capacity(client, organizer, guests, event):
+    Booking.objects.create(user=organizer, event=event)
+    Event.objects.filter(pk=event.pk).update(booked_count=1)
+    login(client, organizer)
+    response = client.post(
+        '/api/bookings/batch/',
+        {'event': event.id, 'users': [guest.id for guest in guests]},
+        format='json'
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == 'Нет доступных мест.'
+    event.refresh_from_db()
+    assert event.booked_count == 1
+    assert Booking.objects.filter(event=event).count() == 1
+
+
+@pytest.mark.django_db
+def test_group_booking_rolls_back_on_duplicate(client, organizer, guests, event):
+    Booking.objects.create(user=guests[2], event=event)
+    Event.objects.filter(pk=event.pk).update(booked_count=1)
+    login(client, organizer)
+    response = client.post(
+        '/api/bookings/batch/',
+        {'event': event.id, 'users': [guests[0].id, guests[2].id]},
+        format='json'
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Booking.objects.filter(event=event).count() == 1
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_only_organizer_books_for_others(client, guests, event):
+    login(client, guests[0])
+    response = client.post(
+        '/api/bookings/batch/',
+        {'event': event.id, 'users': [guests[1].id]},
+        format='json'
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_user_books_several_events(client, organizer, guests, event):
+    other = Event.objects.create(
+        title='Other Event', description='d', start_time=timezone.now() + timedelta(days=2),
+        location='Test City', seats=1, status='planned', organizer=organizer
+    )
+    login(client, guests[0])
+    response = client.post('/api/bookings/batch/', {'events': [event.id, other.id]}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert set(Booking.objects.filter(user=guests[0]).values_list('event_id', flat=True)) == {event.id, other.id}
+
+    # Второе событие заполнено: бронь первого тоже не остаётся.
+    login(client, guests[1])
+    response = client.post('/api/bookings/batch/', {'events': [event.id, other.id]}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Booking.objects.filter(user=guests[1]).exists()
+    assert not NotificationOutbox.objects.filter(user=guests[1]).exists()
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_batch_payload_validation(client, organizer, event):
+    login(client, organizer)
+    for payload in ({}, {'event': event.id, 'events': [event.id]}, {'events': [event.id], 'users': [organizer.id]}):
+        response = client.post('/api/bookings/batch/', payload, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.post('/api/bookings/batch/', {'event': 9999}, format='json')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_group_booking_query_count_is_constant(client, organizer, event, django_assert_max_num_queries):
+    Event.objects.filter(pk=event.pk).update(seats=100)
+    guests = User.objects.bulk_create(User(username=f'many{i}') for i in range(50))
+    login(client, organizer)
+    with django_assert_max_num_queries(13):
+        response = client.post(
+            '/api/bookings/batch/',
+            {'event': event.id, 'users': [guest.id for guest in guests]},
+            format='json'
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+    event.refresh_from_db()
+    assert event.booked_count == 50
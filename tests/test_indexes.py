@@ -0,0 +1,102 @@
+from datetime import timedelta
+from itertools import combinations
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import QueryDict
+from django.utils import timezone
+
+from events.filters import EventFilter
+from events.models import Event, feed_buckets
+
+
+SEED_EVENTS = 50000
+
+
+def seed(organizer_id):
+    """Каталог с распределениями, близкими к реальным: 500 городов, 5% отмен."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Event._meta.db_table} (
+                title, description, start_time, location, seats, booked_count,
+                rating_sum, rating_count, status, organizer_id, created_at, tag_ids
+            )
+            SELECT
+                'Event ' || n,
+                'Description ' || n,
+                now() + ((n %% 8000) - 2000) * interval '1 hour',
+                'City ' || (n %% 500),
+                10 + (n * 7) %% 990,
+                CASE WHEN n %% 50 = 0 THEN 10 + (n * 7) %% 990 ELSE n %% 10 END,
+                (n %% 6) * ((n %% 7) + 1),
+                n %% 6,
+                CASE WHEN n %% 20 = 0 THEN 'canceled'
+                     WHEN n %% 4 = 0 AND n %% 8000 < 2000 THEN 'completed'
+                     ELSE 'planned' END,
+                %s,
+                now(),
+                '{{}}'
+            FROM generate_series(1, %s) AS n
+            """,
+            [organizer_id, SEED_EVENTS]
+        )
+        cursor.execute(f'ANALYZE {Event._meta.db_table}')
+
+
+FILTERS = {
+    'location': 'location=City+7',
+    'status': 'status=canceled',
+    'start_time': 'start_time__gte={soon}&start_time__lte={later}',
+    'seats': 'seats=500',
+    'seats_range': 'seats__gte=980&seats__lte=990',
+    'available': 'available=false',
+    'avg_rating': 'avg_rating=6.5',
+}
+
+
+@pytest.fixture(scope='module')
+def catalog(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        organizer = User.objects.create_user(username='index-organizer')
+        seed(organizer.id)
+    yield
+    with django_db_blocker.unblock():
+        Event.objects.all().delete()
+        organizer.delete()
+
+
+def page_plans(query_string):
+    """EXPLAIN для каждого чтения группы ленты, как его выполняет EventFeedPagination."""
+    now = timezone.now()
+    query_string = query_string.format(
+        soon=(now + timedelta(days=10)).isoformat().replace('+', '%2B'),
+        later=(now + timedelta(days=12)).isoformat().replace('+', '%2B'),
+    )
+    queryset = EventFilter(QueryDict(query_string), queryset=Event.objects.all()).qs
+    return [
+        queryset.filter(bucket).order_by('start_time', 'id')[:21].explain()
+        for bucket in feed_buckets(now)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('fields', [
+    combo for size in (1, 2) for combo in combinations(FILTERS, size)
+], ids='+'.join)
+def test_filter_combination_uses_index(catalog, fields):
+    plans = page_plans('&'.join(FILTERS[field] for field in fields))
+    for plan in plans:
+        assert 'Seq Scan on events_event' not in plan, plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('field, index', [
+    ('location', 'event_location_start_idx'),
+    ('seats', 'event_seats_start_idx'),
+    ('available', 'event_sold_out_idx'),
+])
+def test_selective_filter_reads_dedicated_index(catalog, field, index):
+    upcoming = page_plans(FILTERS[field])[0]
+    assert f'Index Scan using {index}' in upcoming, upcoming
@@ -1,7 +1,13 @@
+from datetime import timedelta
 from unittest.mock import patch
+import contextlib
+import io
+import tracemalloc
 import pytest
-from events.models import Notification, Event, Booking
+from events.models import Notification, NotificationOutbox, Event, Booking
+from events.tasks import notify_users, relay_notification_outbox
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 @pytest.fixture
 def user():
@@ -12,7 +18,7 @@ def event(user):
     return Event.objects.create(
         title='Test Event',
         description='Test description',
-        start_time='2025-05-10T14:00:00Z',
+        start_time=timezone.now() + timedelta(days=1),
         location='Test City',
         seats=100,
         status='planned',
@@ -32,11 +38,13 @@ def test_booking_notification(mock_notify_user, client, user, event):
     url = '/api/bookings/'
     data = {'event': event.id}
     client.post(url, data)
-    mock_notify_user.assert_called_once_with(
-        user.id, 
-        event.id, 
-        'Вы забронировали мероприятие: Test Event'
-    )
+    # Запрос только пишет outbox; уведомление создаёт relay.
+    mock_notify_user.assert_not_called()
+    assert list(NotificationOutbox.objects.values_list('user', 'event', 'message')) == [
+        (user.id, event.id, 'Вы забронировали мероприятие: Test Event')
+    ]
+    relay_notification_outbox()
+    assert Notification.objects.get(user=user, event=event).message == 'Вы забронировали мероприятие: Test Event'
 
 @pytest.mark.django_db
 def test_cancel_booking_notification(client, user, event, mock_notify_user):
@@ -46,11 +54,118 @@ def test_cancel_booking_notification(client, user, event, mock_notify_user):
     url = f'/api/bookings/{booking.id}/cancel_booking/'
     response = client.delete(url)
 
-    mock_notify_user.assert_called_once_with(
-        user.id, 
-        event.id, 
-        'Вы отменили бронирование для мероприятия: Test Event'
-    )
+    assert list(NotificationOutbox.objects.values_list('user', 'event', 'message')) == [
+        (user.id, event.id, 'Вы отменили бронирование для мероприятия: Test Event')
+    ]
 
     assert response.status_code == 204
 
+
+
+@pytest.mark.django_db
+def test_update_status_notifies_attendees_through_outbox(client, user, event):
+    Booking.objects.create(user=user, event=event)
+    client.login(username='testuser', password='testpassword')
+    url = f'/api/events/{event.id}/update_status/'
+
+    response = client.patch(url, {'status': 'canceled'}, content_type='application/json')
+    assert response.status_code == 200
+    assert list(NotificationOutbox.objects.values_list('user_id', 'event_id', 'message')) == [
+        (user.id, event.id, 'Статус мероприятия изменён на «Отменено»: Test Event')
+    ]
+
+    client.patch(url, {'status': 'canceled'}, content_type='application/json')
+    assert NotificationOutbox.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_attendee_fan_out_streams_with_bounded_memory(event):
+    attendees = 5000
+    User.objects.bulk_create(User(username=f'attendee{i}') for i in range(attendees))
+    Booking.objects.bulk_create(
+        Booking(user_id=user_id, event=event)
+        for user_id in User.objects.filter(username__startswith='attendee').values_list('id', flat=True)
+    )
+
+    tracemalloc.start()
+    try:
+        total = NotificationOutbox.objects.enqueue_attendees(event.id, 'Мероприятие отменено.')
+        relay_notification_outbox()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert total == attendees
+    assert Notification.objects.filter(event=event).count() == attendees
+    assert peak < 8 * 1024 * 1024
+
+
+@pytest.fixture
+def notifications(user, event):
+    return [
+        Notification.objects.create(user=user, event=event, message=f'Message {i}')
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_notifications_since_id_returns_only_new(client, user, notifications):
+    client.login(username='testuser', password='testpassword')
+    response = client.get(f'/api/notifications/?since_id={notifications[0].id}')
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json()['results']] == [
+        notifications[2].id, notifications[1].id
+    ]
+
+    response = client.get(f'/api/notifications/?since_id={notifications[2].id}')
+    assert response.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_notifications_since_id_must_be_integer(client, user):
+    client.login(username='testuser', password='testpassword')
+    response = client.get('/api/notifications/?since_id=abc')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_unread_count_is_cached_and_invalidated(client, user, event, notifications):
+    client.login(username='testuser', password='testpassword')
+    assert client.get('/api/notifications/unread_count/').json() == {'unread': 3}
+
+    Notification.objects.create(user=user, event=event, message='Bypasses the counter')
+    assert client.get('/api/notifications/unread_count/').json() == {'unread': 3}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        notify_users([user.id], event.id, 'Через задачу')
+    assert client.get('/api/notifications/unread_count/').json() == {'unread': 5}
+
+
+@pytest.mark.django_db
+def test_mark_read_up_to_id(client, user, notifications):
+    client.login(username='testuser', password='testpassword')
+    client.get('/api/notifications/unread_count/')
+
+    response = client.post(
+        '/api/notifications/mark_read/',
+        {'up_to_id': notifications[1].id},
+        content_type='application/json'
+    )
+
+    assert response.json() == {'marked': 2}
+    assert Notification.objects.filter(user=user, read_at__isnull=True).get() == notifications[2]
+    assert client.get('/api/notifications/unread_count/').json() == {'unread': 1}
+
+
+@pytest.mark.django_db
+def test_mark_read_requires_id(client, user):
+    client.login(username='testuser', password='testpassword')
+    response = client.post('/api/notifications/mark_read/', {}, content_type='application/json')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_notifications_are_read_only(client, user):
+    client.login(username='testuser', password='testpassword')
+    response = client.post('/api/notifications/', {'message': 'x'}, content_type='application/json')
+    assert response.status_code == 405
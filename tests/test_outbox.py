@@ -0,0 +1,82 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event, Notification, NotificationOutbox
+from events.tasks import deliver_outbox, relay_notification_outbox
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def event(user):
+    return Event.objects.create(
+        title='Outbox Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=1,
+        status='planned',
+        organizer=user
+    )
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+def test_rejected_booking_leaves_no_outbox_entry(client, event):
+    Event.objects.filter(pk=event.pk).update(booked_count=1)
+    response = client.post('/api/bookings/', {'event': event.id}, format='json')
+    assert response.status_code == 400
+    assert not NotificationOutbox.objects.exists()
+
+
+@pytest.mark.django_db
+def test_relay_delivers_each_entry_exactly_once(client, user, event):
+    client.post('/api/bookings/', {'event': event.id}, format='json')
+    ids = list(NotificationOutbox.objects.values_list('id', flat=True))
+
+    assert relay_notification_outbox() == 1
+    # Повтор той же задачи (redelivery брокера) и повторный проход relay — без дублей.
+    assert deliver_outbox(ids) == 0
+    assert relay_notification_outbox() == 0
+
+    assert Notification.objects.filter(user=user, event=event).count() == 1
+    assert not NotificationOutbox.objects.exists()
+
+
+@pytest.mark.django_db
+def test_relay_publishes_in_batches(user, event):
+    NotificationOutbox.objects.enqueue([user.id] * 5, event.id, 'Пачка')
+    with patch('events.tasks.deliver_outbox.delay') as deliver:
+        assert relay_notification_outbox(batch_size=2) == 5
+    assert [len(call.args[0]) for call in deliver.call_args_list] == [2, 2, 1]
+
+
+@pytest.mark.django_db
+def test_lost_publication_is_republished_after_timeout(user, event, settings):
+    NotificationOutbox.objects.enqueue([user.id], event.id, 'Потерялось')
+    with patch('events.tasks.deliver_outbox.delay') as lost:
+        relay_notification_outbox()
+    lost.assert_called_once()
+
+    # Опубликованное недавно повторно не публикуется.
+    assert relay_notification_outbox() == 0
+
+    NotificationOutbox.objects.update(
+        dispatched_at=timezone.now() - timedelta(seconds=settings.NOTIFICATION_OUTBOX_REDELIVERY_TIMEOUT + 1)
+    )
+    assert relay_notification_outbox() == 1
+    assert Notification.objects.get(user=user).message == 'Потерялось'
@@ -0,0 +1,100 @@
+from datetime import timedelta
+import pytest
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from events.models import Event
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def feed(user):
+    """Смесь предстоящих, закрытых и просроченных событий с общими start_time."""
+    now = timezone.now()
+    specs = [
+        ('planned', now + timedelta(days=1)),
+        ('planned', now + timedelta(days=1)),
+        ('planned', now + timedelta(days=2)),
+        ('completed', now - timedelta(days=3)),
+        ('canceled', now + timedelta(days=5)),
+        ('completed', now - timedelta(days=3)),
+        ('planned', now - timedelta(days=2)),
+        ('planned', now - timedelta(days=1)),
+    ]
+    return [
+        Event.objects.create(
+            title=f'Event {i}',
+            description='Feed event',
+            start_time=start_time,
+            location='Test City',
+            seats=10,
+            status=event_status,
+            organizer=user
+        )
+        for i, (event_status, start_time) in enumerate(specs)
+    ]
+
+
+def expected_order(events):
+    now = timezone.now()
+
+    def sort_key(event):
+        if event.status == 'planned' and event.start_time >= now:
+            bucket = 1
+        elif event.status != 'planned':
+            bucket = 2
+        else:
+            bucket = 3
+        return (bucket, event.start_time, event.id)
+
+    return [event.id for event in sorted(events, key=sort_key)]
+
+
+@pytest.mark.django_db
+def test_first_page_matches_feed_order(client, feed):
+    response = client.get('/api/events/?page_size=100')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['next'] is None
+    assert [item['id'] for item in response.data['results']] == expected_order(feed)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page_size', [1, 2, 3, 5])
+def test_cursor_walks_whole_feed_without_gaps(client, feed, page_size):
+    seen = []
+    url = f'/api/events/?page_size={page_size}'
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) <= page_size
+        seen.extend(item['id'] for item in response.data['results'])
+        url = response.data['next']
+    assert seen == expected_order(feed)
+
+
+@pytest.mark.django_db
+def test_cursor_keeps_filters(client, feed):
+    response = client.get('/api/events/?status=planned&page_size=2')
+    seen = [item['id'] for item in response.data['results']]
+    response = client.get(response.data['next'])
+    seen += [item['id'] for item in response.data['results']]
+    planned = [event for event in feed if event.status == 'planned']
+    assert seen == expected_order(planned)[:4]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(client, feed):
+    response = client.get('/api/events/?cursor=garbage')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,115 @@
+from datetime import timedelta
+import pytest
+
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from events.models import Event, Booking, Notification, Tag
+
+
+PAGE_SIZES = [10, 50, 100]
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def events(user):
+    """120 событий разных организаторов, у каждого по два тега."""
+    tags = [Tag.objects.create(name=f'tag{i}') for i in range(4)]
+    organizers = [User.objects.create_user(username=f'organizer{i}') for i in range(5)]
+    events = Event.objects.bulk_create(
+        Event(
+            title=f'Event {i}',
+            description='Description',
+            start_time=timezone.now() + timedelta(days=1, hours=i),
+            location='Test City',
+            seats=100,
+            status='planned',
+            organizer=organizers[i % len(organizers)]
+        )
+        for i in range(120)
+    )
+    for i, event in enumerate(events):
+        event.tags.add(tags[i % 4], tags[(i + 1) % 4])
+    return events
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page_size', PAGE_SIZES)
+def test_event_list_query_count(client, events, page_size, django_assert_num_queries):
+    # Одна группа ленты и одна догрузка тегов на всю страницу.
+    with django_assert_num_queries(2):
+        response = client.get(f'/api/events/?page_size={page_size}')
+    assert len(response.data['results']) == page_size
+    assert all(len(item['tags']) == 2 for item in response.data['results'])
+
+
+@pytest.mark.django_db
+def test_event_list_spanning_all_feed_groups_query_count(client, user, events, django_assert_num_queries):
+    Event.objects.filter(pk__in=[e.pk for e in events[:60]]).update(status='completed')
+    Event.objects.filter(pk__in=[e.pk for e in events[60:90]]).update(
+        start_time=timezone.now() - timedelta(days=1)
+    )
+    # Страница из трёх групп ленты: три чтения и одна догрузка тегов.
+    with django_assert_num_queries(4):
+        response = client.get('/api/events/?page_size=100&location=Test+City')
+    assert len(response.data['results']) == 100
+
+
+@pytest.mark.django_db
+def test_event_detail_query_count(client, events, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        client.get(f'/api/events/{events[0].id}/')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', PAGE_SIZES)
+def test_booking_list_query_count(client, user, events, count, django_assert_num_queries):
+    Booking.objects.bulk_create(Booking(user=user, event=event) for event in events[:count])
+    with django_assert_num_queries(1):
+        response = client.get('/api/bookings/')
+    assert len(response.data) == count
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page_size', PAGE_SIZES)
+def test_notification_list_query_count(client, user, events, page_size, django_assert_num_queries):
+    Notification.objects.bulk_create(
+        Notification(user=user, event=event, message='Message') for event in events
+    )
+    with django_assert_num_queries(1):
+        response = client.get(f'/api/notifications/?page_size={page_size}')
+    assert len(response.data['results']) == page_size
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('bookings', [0, 50])
+def test_organizer_dashboard_query_count(user, events, bookings, django_assert_num_queries):
+    organizer = events[0].organizer
+    Event.objects.filter(organizer=organizer).update(rating_sum=9, rating_count=2)
+    Booking.objects.bulk_create(
+        Booking(user=User.objects.create_user(username=f'guest{i}'), event=events[0])
+        for i in range(bookings)
+    )
+    Event.objects.filter(pk=events[0].pk).update(booked_count=bookings)
+    client = APIClient()
+    client.force_authenticate(organizer)
+    # Один запрос на страницу со всеми счётчиками, без догрузок.
+    with django_assert_num_queries(1) as queries:
+        response = client.get('/api/events/mine/?page_size=100')
+    assert 'JOIN "events_booking"' not in queries.captured_queries[0]['sql']
+    assert len(response.data['results']) == 24
+    first = response.data['results'][-1]
+    assert first['id'] == events[0].id
+    assert (first['booked'], first['remaining'], first['avg_rating']) == (bookings, 100 - bookings, 4.5)
@@ -0,0 +1,188 @@
+from datetime import timedelta
+import threading
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event, Booking, Rating
+from events.views import EventViewSet
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def event(user):
+    return Event.objects.create(
+        title='Test Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=5,
+        status='planned',
+        organizer=user
+    )
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_booking_increments_counter(client, user, event):
+    client.login(username='testuser', password='testpassword')
+    response = client.post('/api/bookings/', {'event': event.id}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_duplicate_booking_rejected_without_counting(client, user, event):
+    client.login(username='testuser', password='testpassword')
+    client.post('/api/bookings/', {'event': event.id}, format='json')
+    response = client.post('/api/bookings/', {'event': event.id}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'Вы уже забронировали место' in response.data['detail']
+    event.refresh_from_db()
+    assert event.booked_count == 1
+    assert Booking.objects.filter(event=event).count() == 1
+
+
+@pytest.mark.django_db
+def test_full_event_rejects_booking(client, user, event):
+    event.booked_count = event.seats
+    event.save()
+    client.login(username='testuser', password='testpassword')
+    response = client.post('/api/bookings/', {'event': event.id}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == 'Нет доступных мест.'
+    assert not Booking.objects.filter(event=event).exists()
+
+
+@pytest.mark.django_db
+def test_cancel_booking_decrements_counter(client, user, event):
+    client.login(username='testuser', password='testpassword')
+    booking_id = client.post('/api/bookings/', {'event': event.id}, format='json').data['id']
+    response = client.delete(f'/api/bookings/{booking_id}/cancel_booking/')
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    event.refresh_from_db()
+    assert event.booked_count == 0
+
+
+@pytest.mark.django_db
+def test_reconcile_event_counters(user, event):
+    Booking.objects.create(user=user, event=event)
+    other = User.objects.create_user(username='other', password='testpassword')
+    Booking.objects.create(user=other, event=event)
+    Event.objects.filter(pk=event.pk).update(booked_count=4)
+
+    call_command('reconcile_event_counters')
+
+    event.refresh_from_db()
+    assert event.booked_count == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_bookings_do_not_oversell(event):
+    attempts = 20
+    users = [
+        User.objects.create_user(username=f'user{i}', password='testpassword')
+        for i in range(attempts)
+    ]
+    barrier = threading.Barrier(attempts)
+    codes = []
+
+    def book(user):
+        api_client = APIClient()
+        api_client.force_authenticate(user)
+        barrier.wait()
+        try:
+            response = api_client.post('/api/bookings/', {'event': event.id}, format='json')
+            codes.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=book, args=(u,)) for u in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    event.refresh_from_db()
+    assert codes.count(status.HTTP_201_CREATED) == event.seats
+    assert codes.count(status.HTTP_400_BAD_REQUEST) == attempts - event.seats
+    assert event.booked_count == event.seats
+    assert Booking.objects.filter(event=event).count() == event.seats
+
+
+@pytest.mark.django_db
+def test_reconcile_rating_aggregates(user):
+    event = Event.objects.create(
+        title='Rated Event',
+        description='Rated description',
+        start_time=timezone.now() - timedelta(days=1),
+        location='Test City',
+        seats=5,
+        status='completed',
+        organizer=user
+    )
+    Rating.objects.create(user=user, event=event, score=3)
+
+    call_command('reconcile_event_counters')
+
+    event.refresh_from_db()
+    assert (event.rating_sum, event.rating_count) == (3, 1)
+
+
+@pytest.mark.django_db
+def test_event_updates_keep_concurrent_counter_changes(client, user, event):
+    client.login(username='testuser', password='testpassword')
+    get_object = EventViewSet.get_object
+
+    def get_object_then_book(view):
+        # Бронь другого пользователя успевает между чтением события и записью.
+        instance = get_object(view)
+        Event.objects.filter(pk=instance.pk).update(booked_count=F('booked_count') + 1)
+        return instance
+
+    with patch.object(EventViewSet, 'get_object', get_object_then_book):
+        response = client.patch(f'/api/events/{event.id}/update_status/', {'status': 'completed'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        response = client.patch(f'/api/events/{event.id}/', {'title': 'Renamed'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    event.refresh_from_db()
+    assert event.booked_count == 2
+    assert (event.status, event.title) == ('completed', 'Renamed')
+
+
+@pytest.mark.django_db
+def test_booking_cannot_be_moved_to_another_event(client, user, event):
+    other = Event.objects.create(
+        title='Other Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=5,
+        status='planned',
+        organizer=user
+    )
+    booking = Booking.objects.create(user=user, event=event)
+    client.login(username='testuser', password='testpassword')
+
+    for method in (client.patch, client.put):
+        response = method(f'/api/bookings/{booking.id}/', {'event': other.id}, format='json')
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    booking.refresh_from_db()
+    assert booking.event_id == event.id
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Booking, Event, NotificationOutbox, SeatHold, Waitlist
+from events.tasks import release_expired_holds
+
+
+@pytest.fixture
+def users():
+    return [User.objects.create_user(username=f'user{i}', password='testpassword') for i in range(3)]
+
+
+@pytest.fixture
+def event(users):
+    return Event.objects.create(
+        title='Checkout Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=1,
+        status='planned',
+        organizer=users[0]
+    )
+
+
+def api(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def expire(hold):
+    SeatHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+
+@pytest.mark.django_db
+def test_hold_takes_seat_and_confirm_creates_booking(users, event):
+    response = api(users[1]).post('/api/bookings/hold/', {'event': event.id}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    token = response.data['token']
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+    # Пока место удержано, другой пользователь его не получит.
+    other = api(users[2]).post('/api/bookings/', {'event': event.id}, format='json')
+    assert other.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api(users[1]).post('/api/bookings/confirm/', {'token': token}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['user'] == users[1].username
+    assert Booking.objects.filter(user=users[1], event=event).exists()
+    assert not SeatHold.objects.exists()
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_hold_rejected_when_event_full_or_already_held(users, event):
+    client = api(users[1])
+    assert client.post('/api/bookings/hold/', {'event': event.id}, format='json').status_code == 201
+    again = client.post('/api/bookings/hold/', {'event': event.id}, format='json')
+    assert again.status_code == status.HTTP_400_BAD_REQUEST
+    full = api(users[2]).post('/api/bookings/hold/', {'event': event.id}, format='json')
+    assert full.data['detail'] == 'Нет доступных мест.'
+    assert SeatHold.objects.count() == 1
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_confirm_foreign_or_expired_token(users, event):
+    response = api(users[1]).post('/api/bookings/hold/', {'event': event.id}, format='json')
+    token = response.data['token']
+
+    foreign = api(users[2]).post('/api/bookings/confirm/', {'token': token}, format='json')
+    assert foreign.status_code == status.HTTP_404_NOT_FOUND
+
+    expire(SeatHold.objects.get())
+    expired = api(users[1]).post('/api/bookings/confirm/', {'token': token}, format='json')
+    assert expired.status_code == status.HTTP_400_BAD_REQUEST
+    assert expired.data['detail'] == 'Время удержания истекло.'
+    assert not Booking.objects.exists()
+    event.refresh_from_db()
+    assert event.booked_count == 0
+
+
+@pytest.mark.django_db
+def test_sweeper_releases_expired_holds_in_bulk(users, event):
+    Event.objects.filter(pk=event.pk).update(seats=3)
+    for user in users:
+        api(user).post('/api/bookings/hold/', {'event': event.id}, format='json')
+    expire(SeatHold.objects.get(user=users[0]))
+    expire(SeatHold.objects.get(user=users[1]))
+
+    assert release_expired_holds(batch_size=1) == 2
+
+    assert list(SeatHold.objects.values_list('user', flat=True)) == [users[2].id]
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_expired_hold_goes_to_waitlist_head(users, event):
+    api(users[1]).post('/api/bookings/hold/', {'event': event.id}, format='json')
+    Waitlist.objects.create(user=users[2], event=event)
+    expire(SeatHold.objects.get())
+
+    release_expired_holds()
+
+    assert list(Booking.objects.values_list('user', flat=True)) == [users[2].id]
+    assert not Waitlist.objects.exists()
+    assert list(NotificationOutbox.objects.values_list('user', flat=True)) == [users[2].id]
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_reconcile_counts_active_holds(users, event):
+    api(users[1]).post('/api/bookings/hold/', {'event': event.id}, format='json')
+    Event.objects.filter(pk=event.pk).update(booked_count=0)
+    call_command('reconcile_event_counters')
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+
+@pytest.mark.django_db
+def test_direct_booking_consumes_own_hold(users, event):
+    Event.objects.filter(pk=event.pk).update(seats=2)
+    client = api(users[1])
+    token = client.post('/api/bookings/hold/', {'event': event.id}, format='json').data['token']
+
+    response = client.post('/api/bookings/', {'event': event.id}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not SeatHold.objects.exists()
+    event.refresh_from_db()
+    assert event.booked_count == 1
+
+    confirm = client.post('/api/bookings/confirm/', {'token': token}, format='json')
+    assert confirm.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_batch_booking_consumes_own_hold(users, event):
+    Event.objects.filter(pk=event.pk).update(seats=2)
+    other = Event.objects.create(
+        title='Second Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=2),
+        location='Test City',
+        seats=1,
+        status='planned',
+        organizer=users[0]
+    )
+    client = api(users[1])
+    client.post('/api/bookings/hold/', {'event': event.id}, format='json')
+
+    response = client.post('/api/bookings/batch/', {'events': [event.id, other.id]}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not SeatHold.objects.exists()
+    event.refresh_from_db()
+    other.refresh_from_db()
+    assert (event.booked_count, other.booked_count) == (1, 1)
+
+    # Второе место первого события свободно для других.
+    assert api(users[2]).post('/api/bookings/', {'event': event.id}, format='json').status_code == 201
+
+
+@pytest.mark.django_db
+def test_confirm_rejected_after_booking_cutoff(users, event):
+    token = api(users[1]).post('/api/bookings/hold/', {'event': event.id}, format='json').data['token']
+    Event.objects.filter(pk=event.pk).update(start_time=timezone.now() + timedelta(minutes=10))
+
+    response = api(users[1]).post('/api/bookings/confirm/', {'token': token}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'менее 30 минут' in response.data['detail']
+    assert not Booking.objects.exists() and not SeatHold.objects.exists()
+    event.refresh_from_db()
+    assert event.booked_count == 0
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Event, Tag
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def event(user):
+    event = Event.objects.create(
+        title='Test Event',
+        description='Long description ' * 100,
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=100,
+        status='planned',
+        organizer=user
+    )
+    event.tags.add(Tag.objects.create(name='music'))
+    return event
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+def sql(queries):
+    return '\n'.join(query['sql'] for query in queries.captured_queries)
+
+
+# Короткая страница читает все три группы ленты; догрузки тегов нет.
+@pytest.mark.django_db
+def test_fields_trims_payload_and_sql(client, event, django_assert_num_queries):
+    with django_assert_num_queries(3) as queries:
+        response = client.get('/api/events/', {'fields': 'title,id'})
+    assert response.data['results'] == [{'id': event.id, 'title': 'Test Event'}]
+    assert '"description"' not in sql(queries) and 'auth_user' not in sql(queries)
+
+
+@pytest.mark.django_db
+def test_omit_drops_fields_and_their_relations(client, event, django_assert_num_queries):
+    with django_assert_num_queries(3) as queries:
+        response = client.get('/api/events/', {'omit': 'description,tags'})
+    item = response.data['results'][0]
+    assert 'description' not in item and 'tags' not in item
+    assert item['organizer'] == 'testuser'
+    assert '"description"' not in sql(queries)
+
+
+@pytest.mark.django_db
+def test_compact_list_and_full_detail(client, event, django_assert_num_queries):
+    with django_assert_num_queries(3) as queries:
+        response = client.get('/api/events/', {'compact': 'true'})
+    assert list(response.data['results'][0]) == ['id', 'title', 'start_time', 'location', 'status']
+    assert '"description"' not in sql(queries)
+
+    detail = client.get(f'/api/events/{event.id}/', {'compact': 'true'})
+    assert detail.data['description'] == event.description
+    assert client.get(f'/api/events/{event.id}/', {'fields': 'tags'}).data == {
+        'tags': [{'id': event.tags.get().id, 'name': 'music'}]
+    }
+
+
+@pytest.mark.django_db
+def test_compact_accepts_fields(client, event):
+    response = client.get('/api/events/', {'compact': '1', 'fields': 'id,status'})
+    assert response.data['results'] == [{'id': event.id, 'status': 'planned'}]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {'fields': 'id,secret'},
+    {'omit': 'organizer_id'},
+    {'fields': 'id', 'omit': 'title'},
+    {'compact': 'true', 'fields': 'description'},
+])
+def test_invalid_fieldsets_are_rejected(client, event, params):
+    assert client.get('/api/events/', params).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_fieldsets_do_not_affect_writes(client, user, event):
+    client.force_authenticate(user)
+    response = client.patch(f'/api/events/{event.id}/?fields=id', {'seats': 50}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['seats'] == 50 and 'description' in response.data
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Booking, Event, EventHourlyStats, EventRatingStats
+
+
+@pytest.fixture
+def users():
+    return [User.objects.create_user(username=f'user{i}', password='testpassword') for i in range(4)]
+
+
+@pytest.fixture
+def event(users):
+    return Event.objects.create(
+        title='Stats Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=4,
+        status='planned',
+        organizer=users[0]
+    )
+
+
+def api(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def book(user, event):
+    return api(user).post('/api/bookings/', {'event': event.id}, format='json')
+
+
+@pytest.mark.django_db
+def test_bookings_and_cancellations_roll_up_by_hour(users, event):
+    for user in users[1:]:
+        assert book(user, event).status_code == status.HTTP_201_CREATED
+    booking = Booking.objects.get(user=users[1])
+    api(users[1]).delete(f'/api/bookings/{booking.id}/cancel_booking/')
+
+    response = api(users[0]).get(f'/api/events/{event.id}/stats/')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['booked'] == 2
+    assert response.data['fill_percent'] == 50.0
+    assert [(row['bookings'], row['cancellations']) for row in response.data['hourly']] == [(3, 1)]
+
+
+@pytest.mark.django_db
+def test_stats_only_for_organizer(users, event):
+    response = api(users[1]).get(f'/api/events/{event.id}/stats/')
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_rating_histogram_follows_rating_changes(users, event):
+    event.status = 'completed'
+    event.save()
+    for user, score in zip(users[1:], [5, 5, 3]):
+        Booking.objects.create(user=user, event=event)
+        api(user).post('/api/ratings/', {'event': event.id, 'score': score}, format='json')
+
+    rating_id = api(users[3]).get('/api/ratings/').data[0]['id']
+    api(users[3]).patch(f'/api/ratings/{rating_id}/', {'score': 4}, format='json')
+    rating_id = api(users[2]).get('/api/ratings/').data[0]['id']
+    api(users[2]).delete(f'/api/ratings/{rating_id}/')
+
+    rating = api(users[0]).get(f'/api/events/{event.id}/stats/').data['rating']
+    assert rating['histogram'] == {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}
+    assert (rating['count'], rating['average']) == (2, 4.5)
+
+
+@pytest.mark.django_db
+def test_group_booking_and_waitlist_promotion_are_counted(users, event):
+    Event.objects.filter(pk=event.pk).update(seats=2)
+    response = api(users[0]).post(
+        '/api/bookings/batch/', {'event': event.id, 'users': [users[1].id, users[2].id]}, format='json'
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    api(users[3]).post('/api/waitlist/', {'event': event.id}, format='json')
+    booking = Booking.objects.get(user=users[1])
+    api(users[1]).delete(f'/api/bookings/{booking.id}/cancel_booking/')
+
+    stats = EventHourlyStats.objects.get(event=event)
+    assert (stats.bookings, stats.cancellations) == (3, 1)
+
+
+@pytest.mark.django_db
+def test_stats_query_count_does_not_depend_on_attendees(users, event):
+    Event.objects.filter(pk=event.pk).update(seats=1000)
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    attendees = User.objects.bulk_create([User(username=f'attendee{i}') for i in range(300)])
+    Booking.objects.bulk_create([Booking(user=user, event=event) for user in attendees])
+    EventHourlyStats.objects.bulk_create([
+        EventHourlyStats(event=event, hour=now - timedelta(hours=hour), bookings=10)
+        for hour in range(30)
+    ])
+    EventRatingStats.objects.create(event=event, score=5, count=1)
+
+    client = api(users[0])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f'/api/events/{event.id}/stats/')
+    assert len(response.data['hourly']) == 30
+    assert not any('events_booking' in query['sql'] for query in queries.captured_queries)
@@ -0,0 +1,179 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from events.models import Event, Notification
+from events.streams import CLOSE, STREAM_PATH, RedisBroker, get_broker, publish_notifications
+from events.tasks import notify_users
+from events_app.asgi import application
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='testuser', password='testpassword')
+
+
+@pytest.fixture
+def event(user):
+    return Event.objects.create(
+        title='Test Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=100,
+        status='planned',
+        organizer=user
+    )
+
+
+@pytest.fixture
+def session_cookie(client, user):
+    client.login(username='testuser', password='testpassword')
+    return f"sessionid={client.cookies['sessionid'].value}".encode()
+
+
+def stream_scope(cookie=None, query_string=b''):
+    headers = [(b'cookie', cookie)] if cookie else []
+    return {'type': 'http', 'path': STREAM_PATH, 'headers': headers, 'query_string': query_string}
+
+
+class StreamClient:
+    """Подключение к ASGI-приложению с очередями вместо сокета."""
+
+    def __init__(self, scope):
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+        self.task = asyncio.ensure_future(application(scope, self.inbox.get, self.outbox.put))
+
+    async def next_message(self):
+        return await asyncio.wait_for(self.outbox.get(), 5)
+
+    async def next_event(self):
+        message = await self.next_message()
+        lines = message['body'].decode().split('\n')
+        return json.loads(lines[2][len('data: '):])
+
+    async def disconnect(self):
+        await self.inbox.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(self.task, 5)
+
+
+def create_and_publish(user, event, message, capture_on_commit):
+    with capture_on_commit(execute=True):
+        notification = Notification.objects.create(user=user, event=event, message=message)
+        publish_notifications([notification])
+    return notification
+
+
+@pytest.mark.django_db
+def test_stream_requires_authentication():
+    async def scenario():
+        stream = StreamClient(stream_scope())
+        start = await stream.next_message()
+        await asyncio.wait_for(stream.task, 5)
+        return start
+
+    assert async_to_sync(scenario)()['status'] == 401
+
+
+@pytest.mark.django_db
+def test_stream_pushes_new_notifications(user, event, session_cookie, django_capture_on_commit_callbacks):
+    async def scenario():
+        stream = StreamClient(stream_scope(session_cookie))
+        start = await stream.next_message()
+        created = await sync_to_async(create_and_publish)(
+            user, event, 'Live message', django_capture_on_commit_callbacks
+        )
+        payload = await stream.next_event()
+        await stream.disconnect()
+        return start, created, payload
+
+    start, created, payload = async_to_sync(scenario)()
+    assert start['status'] == 200
+    assert (b'content-type', b'text/event-stream') in start['headers']
+    assert payload['id'] == created.id
+    assert payload['message'] == 'Live message'
+    assert payload['user'] == 'testuser'
+    assert get_broker().connection_count() == 0
+
+
+@pytest.mark.django_db
+def test_stream_replays_after_last_event_id(user, event, session_cookie):
+    first = Notification.objects.create(user=user, event=event, message='Seen')
+    missed = Notification.objects.create(user=user, event=event, message='Missed')
+
+    async def scenario():
+        stream = StreamClient(stream_scope(session_cookie, f'last_event_id={first.id}'.encode()))
+        await stream.next_message()
+        payload = await stream.next_event()
+        await stream.disconnect()
+        return payload
+
+    assert async_to_sync(scenario)()['id'] == missed.id
+
+
+@pytest.mark.django_db
+def test_stream_sends_heartbeat(settings, session_cookie):
+    settings.NOTIFICATION_STREAM_HEARTBEAT = 0.05
+
+    async def scenario():
+        stream = StreamClient(stream_scope(session_cookie))
+        await stream.next_message()
+        heartbeat = await stream.next_message()
+        await stream.disconnect()
+        return heartbeat
+
+    assert async_to_sync(scenario)()['body'] == b': keep-alive\n\n'
+
+
+@pytest.mark.django_db
+def test_notify_users_publishes_after_commit(user, event, django_capture_on_commit_callbacks):
+    broker = get_broker()
+    with patch.object(broker, 'has_subscribers', return_value=True), \
+            patch.object(broker, 'publish') as mock_publish:
+        with django_capture_on_commit_callbacks(execute=True):
+            notify_users([user.id], event.id, 'Committed')
+            mock_publish.assert_not_called()
+    user_id, payload = mock_publish.call_args.args
+    assert user_id == user.id
+    assert payload['message'] == 'Committed'
+    assert payload['user'] == 'testuser'
+
+
+@pytest.mark.django_db
+def test_publish_skips_users_without_subscribers(user, event, django_capture_on_commit_callbacks):
+    notification = Notification.objects.create(user=user, event=event, message='Nobody listens')
+    with django_capture_on_commit_callbacks() as callbacks:
+        publish_notifications([notification])
+    assert callbacks == []
+
+
+def test_redis_listener_survives_lost_connection(settings):
+    settings.NOTIFICATION_STREAM_RECONNECT_DELAY = 0.01
+    # Порт, на котором Redis заведомо не слушает.
+    broker = RedisBroker('redis://127.0.0.1:1/0')
+
+    async def scenario():
+        queue = broker.subscribe(1)
+        closed = await asyncio.wait_for(queue.get(), 5)
+        listener = broker._listeners[asyncio.get_running_loop()]
+        await asyncio.sleep(0.05)
+        alive = not listener.done()
+
+        # Упавший слушатель заменяется при следующей подписке.
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        broker.subscribe(2)
+        restarted = broker._listeners[asyncio.get_running_loop()]
+        restarted.cancel()
+        await asyncio.gather(restarted, return_exceptions=True)
+        return closed, alive, restarted is not listener
+
+    with patch('events.streams.logger'):
+        assert async_to_sync(scenario)() == (CLOSE, True, True)
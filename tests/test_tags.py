@@ -4,8 +4,11 @@ import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import QueryDict
 from django.utils import timezone
 
+from events.filters import EventFilter
 from events.models import Event, Tag
 
 
@@ -50,7 +53,7 @@ def test_filter_events_by_tags(client, event_with_tags, tag1, tag2):
     response = client.get(f'/api/events/?tags={tag1.id}&tags={tag2.id}')
     #response = client.get(f'/api/events/?tags={tag1.id}&tags={tag2.id}')
     assert response.status_code == status.HTTP_200_OK
-    data = response.data
+    data = response.data['results']
     assert len(data) == 1
     assert data[0]['id'] == event_with_tags.id
 
@@ -91,4 +94,57 @@ def test_update_event_tags(client, user, event_with_tags, tag1, tag2):
     response = client.put(url, data, format='json')
     assert response.status_code == status.HTTP_200_OK
     event = Event.objects.get(id=event_with_tags.id)
-    assert set(event.tags.values_list('id', flat=True)) == {tag1.id}
\ No newline at end of file
+    assert set(event.tags.values_list('id', flat=True)) == {tag1.id}
+
+@pytest.mark.django_db
+def test_filter_by_tags_requires_every_tag(client, user, event_with_tags, tag1, tag2):
+    partial = Event.objects.create(
+        title='Partly Tagged', description='d', start_time=timezone.now() + timedelta(days=1),
+        location='Test City', seats=100, status='planned', organizer=user
+    )
+    partial.tags.add(tag1)
+    client.login(username='testuser', password='testpassword')
+
+    response = client.get(f'/api/events/?tags={tag1.id}')
+    assert {item['id'] for item in response.data['results']} == {event_with_tags.id, partial.id}
+
+    response = client.get(f'/api/events/?tags={tag1.id}&tags={tag2.id}&tags={tag1.id}')
+    assert [item['id'] for item in response.data['results']] == [event_with_tags.id]
+
+
+@pytest.mark.django_db
+def test_filter_by_tags_reads_stored_tag_ids(event_with_tags, tag1, tag2):
+    query = str(EventFilter(
+        QueryDict(f'tags={tag1.id}&tags={tag2.id}'), queryset=Event.objects.all()
+    ).qs.query)
+    assert 'events_event_tags' not in query
+    assert '"tag_ids" @>' in query
+
+
+@pytest.mark.django_db
+def test_tag_ids_follow_tag_changes(user, event_with_tags, tag1, tag2):
+    assert event_with_tags.tag_ids == sorted([tag1.id, tag2.id])
+
+    event_with_tags.tags.remove(tag1)
+    event_with_tags.refresh_from_db()
+    assert event_with_tags.tag_ids == [tag2.id]
+
+    tag1.events.add(event_with_tags)
+    event_with_tags.refresh_from_db()
+    assert event_with_tags.tag_ids == sorted([tag1.id, tag2.id])
+
+    tag1.events.clear()
+    event_with_tags.refresh_from_db()
+    assert event_with_tags.tag_ids == [tag2.id]
+
+    tag2.delete()
+    event_with_tags.refresh_from_db()
+    assert event_with_tags.tag_ids == []
+
+
+@pytest.mark.django_db
+def test_reconcile_rebuilds_tag_ids(event_with_tags, tag1, tag2):
+    Event.objects.filter(pk=event_with_tags.pk).update(tag_ids=[])
+    call_command('reconcile_event_counters')
+    event_with_tags.refresh_from_db()
+    assert event_with_tags.tag_ids == sorted([tag1.id, tag2.id])
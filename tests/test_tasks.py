@@ -5,7 +5,7 @@ from django.utils import timezone
 from unittest.mock import patch
 
 from events.models import Event, Notification, User
-from events.tasks import notify_user, complete_old_events
+from events.tasks import notify_user, notify_users, complete_old_events
 
 
 @pytest.fixture
@@ -42,3 +42,64 @@ def test_complete_old_events(event):
         complete_old_events()
         event.refresh_from_db()
         assert event.status == 'completed'
+
+
+@pytest.mark.django_db
+def test_complete_old_events_in_batches_returns_ids(user, event):
+    old_events = [
+        Event.objects.create(
+            title=f'Old Event {i}',
+            description='Old description',
+            start_time=timezone.now() - timedelta(hours=3 + i),
+            location='Test City',
+            seats=10,
+            status='planned',
+            organizer=user
+        )
+        for i in range(5)
+    ]
+    canceled = Event.objects.create(
+        title='Canceled Event',
+        description='Canceled description',
+        start_time=timezone.now() - timedelta(hours=5),
+        location='Test City',
+        seats=10,
+        status='canceled',
+        organizer=user
+    )
+
+    completed_ids = complete_old_events(batch_size=2)
+
+    assert sorted(completed_ids) == sorted(e.id for e in old_events)
+    assert set(
+        Event.objects.filter(status='completed').values_list('id', flat=True)
+    ) == set(completed_ids)
+    event.refresh_from_db()
+    canceled.refresh_from_db()
+    assert event.status == 'planned'
+    assert canceled.status == 'canceled'
+
+
+@pytest.mark.django_db
+def test_complete_old_events_nothing_to_do(event):
+    assert complete_old_events() == []
+
+
+@pytest.mark.django_db
+def test_notify_users_creates_batch_and_skips_unknown(user, event):
+    others = [User.objects.create_user(username=f'user{i}') for i in range(3)]
+    user_ids = [user.id] + [other.id for other in others] + [user.id, 10 ** 9]
+
+    created = notify_users(user_ids, event.id, 'Batch message')
+
+    assert created == 4
+    notifications = Notification.objects.filter(event=event, message='Batch message')
+    assert sorted(notifications.values_list('user_id', flat=True)) == sorted(
+        [user.id] + [other.id for other in others]
+    )
+
+
+@pytest.mark.django_db
+def test_notify_users_unknown_event(user):
+    assert notify_users([user.id], 10 ** 9, 'Lost message') == 0
+    assert not Notification.objects.exists()
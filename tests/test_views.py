@@ -1,7 +1,7 @@
 import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
-from events.models import Event, Booking, Rating
+from events.models import Event, Booking, NotificationOutbox, Rating, SeatHold
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -53,7 +53,7 @@ def test_event_list(client, event, past_event):
     client.login(username='testuser', password='testpassword')
     response = client.get('/api/events/')
     assert response.status_code == status.HTTP_200_OK
-    data = response.data
+    data = response.data['results']
     assert len(data) == 2
     # Проверяем сортировку: предстоящие (event) перед прошедшими (past_event)
     assert data[0]['id'] == event.id
@@ -118,7 +118,32 @@ def test_event_list_sorted_by_rating(client, user, past_event):
     Rating.objects.create(user=user, event=past_event, score=5)
     response = client.get('/api/events/?ordering=-avg_rating')
     assert response.status_code == status.HTTP_200_OK
-    data = response.data
+    data = response.data['results']
     # Проверяем, что past_event с рейтингом идёт первым
     assert len(data) >= 1
-    assert data[0]['id'] == past_event.id  # Прошедшее событие с рейтингом
\ No newline at end of file
+    assert data[0]['id'] == past_event.id  # Прошедшее событие с рейтингом
+
+@pytest.mark.django_db
+def test_organizer_dashboard_lists_only_own_events(client, user, event):
+    other = User.objects.create_user(username='other', password='testpassword')
+    Event.objects.create(
+        title='Foreign Event',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=2),
+        location='Test City',
+        seats=10,
+        organizer=other
+    )
+    Booking.objects.create(user=other, event=event)
+    SeatHold.objects.create(user=user, event=event, expires_at=timezone.now() + timedelta(minutes=10))
+    Event.objects.filter(pk=event.pk).update(booked_count=2)
+    NotificationOutbox.objects.enqueue([other.id], event.id, 'Ожидает доставки')
+
+    client.force_authenticate(user)
+    response = client.get('/api/events/mine/')
+    assert response.status_code == status.HTTP_200_OK
+    assert [item['id'] for item in response.data['results']] == [event.id]
+    item = response.data['results'][0]
+    assert (item['booked'], item['pending_notifications'], item['avg_rating']) == (1, 1, None)
+    # Удержание — отдельный счётчик: вместе с бронями и свободными местами дают seats.
+    assert (item['held'], item['booked'] + item['held'] + item['remaining']) == (1, event.seats)
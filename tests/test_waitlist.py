@@ -0,0 +1,157 @@
+from datetime import timedelta
+import threading
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from events.models import Booking, Event, NotificationOutbox, Waitlist
+
+
+@pytest.fixture
+def users():
+    return [User.objects.create_user(username=f'user{i}', password='testpassword') for i in range(4)]
+
+
+@pytest.fixture
+def full_event(users):
+    """Событие на одно место, занятое users[0]."""
+    event = Event.objects.create(
+        title='Sold Out',
+        description='Test description',
+        start_time=timezone.now() + timedelta(days=1),
+        location='Test City',
+        seats=1,
+        booked_count=1,
+        status='planned',
+        organizer=users[0]
+    )
+    Booking.objects.create(user=users[0], event=event)
+    return event
+
+
+def api(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+def test_join_waitlist_returns_fifo_position(users, full_event):
+    first = api(users[1]).post('/api/waitlist/', {'event': full_event.id}, format='json')
+    second = api(users[2]).post('/api/waitlist/', {'event': full_event.id}, format='json')
+    assert first.status_code == status.HTTP_201_CREATED
+    assert (first.data['position'], second.data['position']) == (1, 2)
+
+    Waitlist.objects.filter(user=users[1]).delete()
+    response = api(users[2]).get('/api/waitlist/')
+    assert [entry['position'] for entry in response.data] == [1]
+
+
+@pytest.mark.django_db
+def test_join_waitlist_rejections(users, full_event):
+    client = api(users[1])
+    assert client.post('/api/waitlist/', {'event': full_event.id}, format='json').status_code == 201
+    duplicate = client.post('/api/waitlist/', {'event': full_event.id}, format='json')
+    assert duplicate.status_code == status.HTTP_400_BAD_REQUEST
+
+    booked = api(users[0]).post('/api/waitlist/', {'event': full_event.id}, format='json')
+    assert booked.status_code == status.HTTP_400_BAD_REQUEST
+
+    Event.objects.filter(pk=full_event.pk).update(seats=2)
+    free = api(users[2]).post('/api/waitlist/', {'event': full_event.id}, format='json')
+    assert free.status_code == status.HTTP_400_BAD_REQUEST
+    assert free.data['detail'] == 'Есть свободные места, забронируйте напрямую.'
+
+
+@pytest.mark.django_db
+def test_cancel_promotes_head_of_waitlist(users, full_event):
+    for user in users[1:3]:
+        Waitlist.objects.create(user=user, event=full_event)
+    booking = Booking.objects.get(user=users[0])
+
+    response = api(users[0]).delete(f'/api/bookings/{booking.id}/cancel_booking/')
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    assert list(Booking.objects.filter(event=full_event).values_list('user', flat=True)) == [users[1].id]
+    assert list(Waitlist.objects.values_list('user', flat=True)) == [users[2].id]
+    full_event.refresh_from_db()
+    assert full_event.booked_count == 1
+    assert NotificationOutbox.objects.filter(
+        user=users[1], event=full_event, message='Освободилось место, вы записаны на мероприятие: Sold Out'
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_promotion_skips_users_who_already_booked(users, full_event):
+    Event.objects.filter(pk=full_event.pk).update(seats=2, booked_count=2)
+    Booking.objects.create(user=users[1], event=full_event)
+    Waitlist.objects.create(user=users[1], event=full_event)
+    Waitlist.objects.create(user=users[2], event=full_event)
+
+    api(users[0]).delete(f'/api/bookings/{Booking.objects.get(user=users[0]).id}/')
+
+    assert set(Booking.objects.values_list('user', flat=True)) == {users[1].id, users[2].id}
+    assert not Waitlist.objects.exists()
+
+
+@pytest.mark.django_db
+def test_cancel_without_waitlist_releases_seat(users, full_event):
+    api(users[0]).delete(f'/api/bookings/{Booking.objects.get(user=users[0]).id}/')
+    full_event.refresh_from_db()
+    assert full_event.booked_count == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_cancellations_promote_different_users():
+    holders = [User.objects.create_user(username=f'holder{i}') for i in range(5)]
+    waiting = [User.objects.create_user(username=f'waiting{i}') for i in range(5)]
+    event = Event.objects.create(
+        title='Concurrent', description='d', start_time=timezone.now() + timedelta(days=1),
+        location='Test City', seats=5, booked_count=5, status='planned', organizer=holders[0]
+    )
+    bookings = [Booking.objects.create(user=user, event=event) for user in holders]
+    for user in waiting:
+        Waitlist.objects.create(user=user, event=event)
+    barrier = threading.Barrier(len(bookings))
+
+    def cancel(booking):
+        barrier.wait()
+        try:
+            api(booking.user).delete(f'/api/bookings/{booking.id}/')
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=cancel, args=(b,)) for b in bookings]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    event.refresh_from_db()
+    assert set(Booking.objects.values_list('user', flat=True)) == {user.id for user in waiting}
+    assert not Waitlist.objects.exists()
+    assert event.booked_count == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('changes', [
+    {'status': 'canceled'},
+    {'start_time': timezone.now() + timedelta(minutes=10)},
+])
+def test_cancel_does_not_promote_to_unbookable_event(users, full_event, changes):
+    Waitlist.objects.create(user=users[1], event=full_event)
+    Event.objects.filter(pk=full_event.pk).update(**changes)
+    booking = Booking.objects.get(user=users[0])
+
+    response = api(users[0]).delete(f'/api/bookings/{booking.id}/cancel_booking/')
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    assert not Booking.objects.filter(event=full_event).exists()
+    assert not Waitlist.objects.exists()
+    assert list(NotificationOutbox.objects.values_list('user', flat=True)) == [users[0].id]
+    full_event.refresh_from_db()
+    assert full_event.booked_count == 0